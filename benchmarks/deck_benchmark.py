@@ -0,0 +1,99 @@
+"""
+Microbenchmarks of the deck operations on large custom decks.
+The deque-based Deck is compared with the previous list-based implementation,
+which inserted returned cards at index 0 and reshuffled the whole deck on every return.
+
+Run from the repository root: python benchmarks/deck_benchmark.py
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "../src/game"))
+
+from cards import Deck
+
+
+class ListDeck:
+    """
+    Previous list-based deck, kept here for comparison.
+    """
+
+    def __init__(self, cards=(), rng: random.Random = None):
+        self.cards = list(cards)
+        self.rng = rng or random.Random()
+
+    def shuffle(self):
+        self.rng.shuffle(self.cards)
+
+    def draw_card(self):
+        return self.cards.pop() if self.cards else None
+
+    def return_cards(self, cards):
+        self.cards.extend(cards)
+        self.shuffle()
+
+    def add_card_to_bottom(self, card):
+        self.cards.insert(0, card)
+
+
+def measure(name: str, function, deck_class, size: int, operations: int):
+    deck = deck_class(range(size), rng=random.Random(0))
+
+    start = time.perf_counter()
+    function(deck, operations)
+    elapsed = time.perf_counter() - start
+
+    print(f"  {deck_class.__name__:8} {name}: {elapsed * 1000:9.2f} ms ({elapsed / operations * 1e6:.3f} us/op)")
+
+    return elapsed
+
+
+def add_to_bottom(deck, operations: int):
+    """
+    Draw a card and put it back to the bottom, as with the returned destination tickets.
+    """
+
+    for _ in range(operations):
+        deck.add_card_to_bottom(deck.draw_card())
+
+
+def draw_and_return(deck, operations: int):
+    """
+    Draw a card and return it, as with the cards spent on a claimed route.
+    """
+
+    for _ in range(operations):
+        deck.return_cards([deck.draw_card()])
+
+
+def draw_all(deck, operations: int):
+    """
+    Draw cards until the deck is empty.
+    """
+
+    for _ in range(operations):
+        deck.draw_card()
+
+
+def main():
+    for size in (1_000, 100_000):
+        print(f"Deck of {size} cards")
+
+        # Returning cards reshuffled the whole list deck, so it gets fewer operations
+        cases = [
+            ("add card to bottom", add_to_bottom, 10_000, 10_000),
+            ("draw and return", draw_and_return, 10_000, 100 if size > 10_000 else 1_000),
+            ("draw all cards", draw_all, size, size),
+        ]
+
+        for name, function, operations, list_operations in cases:
+            deque_time = measure(name, function, Deck, size, operations) / operations
+            list_time = measure(name, function, ListDeck, size, list_operations) / list_operations
+            print(f"  speedup {list_time / deque_time:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Benchmark of the search state: random playouts with apply/undo compared with copying the whole Game.
+Every playout is undone and the state is checked to be equal to the one before it.
+
+Run from the repository root: python benchmarks/game_state_benchmark.py
+"""
+
+import copy
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "../src/game"))
+
+from actions import KeepDestinationTickets
+from game_state import GameState
+from simulate import create_game
+
+
+def started_game(seed: int, num_players: int = 3, turns: int = 20):
+    """
+    Returns a headless game after the setup and some random turns.
+    """
+
+    game = create_game(num_players, seed)
+    game.start()
+    rng = random.Random(seed)
+
+    while game.destination_tickets_to_choose or game.turn_number < turns:
+        actions = game.legal_actions()
+        if game.destination_tickets_to_choose:
+            actions = [action for action in actions if isinstance(action, KeepDestinationTickets)]
+        game.apply(rng.choice(actions))
+
+    return game
+
+
+def snapshot(state: GameState):
+    """
+    Everything apply() changes.
+    """
+
+    skipped = ("history", "compiled", "payment_planner", "rng")
+    values = {name: value for name, value in vars(state).items() if name not in skipped}
+
+    return copy.deepcopy(values), state.rng.getstate()
+
+
+def playouts_apply_undo(state: GameState, playouts: int, rng: random.Random):
+    """
+    Random playouts to the end of the game, undone after each one.
+    Returns the number of applied moves.
+    """
+
+    nodes = 0
+    for _ in range(playouts):
+        depth = 0
+        while not state.game_over:
+            state.apply(rng.choice(state.legal_moves()))
+            depth += 1
+
+        for _ in range(depth):
+            state.undo()
+        nodes += depth
+
+    return nodes
+
+
+def playouts_copy_game(game, playouts: int, rng: random.Random):
+    """
+    Random playouts on deep copies of the game, as a bot had to do without GameState.
+    """
+
+    nodes = 0
+    for _ in range(playouts):
+        playout = copy.deepcopy(game)
+        while not playout.game_over:
+            playout.apply(rng.choice(playout.legal_actions()))
+            nodes += 1
+
+    return nodes
+
+
+def main():
+    game = started_game(seed=1)
+    state = GameState.from_game(game, rng=random.Random(1))
+    before = snapshot(state)
+
+    start = time.perf_counter()
+    nodes = playouts_apply_undo(state, 200, random.Random(0))
+    elapsed = time.perf_counter() - start
+    print(f"GameState apply/undo: {nodes} moves in {elapsed * 1000:.0f} ms ({nodes / elapsed:,.0f} moves/s)")
+
+    if snapshot(state) != before:
+        print("  ERROR: state differs after undoing the playouts")
+
+    start = time.perf_counter()
+    nodes = playouts_copy_game(game, 20, random.Random(0))
+    elapsed = time.perf_counter() - start
+    print(f"deepcopy(Game) playouts: {nodes} moves in {elapsed * 1000:.0f} ms ({nodes / elapsed:,.0f} moves/s)")
+
+    start = time.perf_counter()
+    copies = 1000
+    for _ in range(copies):
+        state.copy()
+    elapsed = time.perf_counter() - start
+    print(f"GameState.copy: {elapsed / copies * 1e6:.1f} us")
+
+
+if __name__ == "__main__":
+    main()
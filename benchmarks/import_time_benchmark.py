@@ -0,0 +1,90 @@
+"""
+Benchmark of the cold start of the game modules (python -X importtime).
+Every module is imported in a fresh interpreter, so the numbers include all its dependencies.
+Headless entry points (game, simulate) should not import pygame or the GUI.
+
+Run from the repository root: python benchmarks/import_time_benchmark.py
+"""
+
+import os
+import subprocess
+import sys
+import time
+
+GAME_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "../src/game")
+
+MODULES = ["map", "game", "simulate", "gui"]
+HEADLESS_MODULES = ["game", "simulate"]
+WINDOW_MODULES = ["pygame", "gui", "yaml"]  # Must not be loaded by headless modules (YAML only without cache)
+
+
+def import_times(module: str):
+    """
+    Imports the module in a new interpreter.
+    Returns (total import time in ms, list of (cumulative ms, imported module) sorted from the slowest,
+    window modules loaded by the import).
+    """
+
+    code = (
+        f"import sys; import {module}; "
+        f"print(','.join(name for name in {WINDOW_MODULES!r} if name in sys.modules and name != {module!r}))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=GAME_FOLDER,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    imports = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+
+        _, cumulative, name = line[len("import time:") :].split("|")
+        imports.append((int(cumulative) / 1000, name.strip()))
+
+    total = next(cumulative for cumulative, name in imports if name == module)
+    imports.sort(reverse=True)
+    loaded_window_modules = [name for name in result.stdout.strip().split(",") if name]
+
+    return total, imports, loaded_window_modules
+
+
+def startup_time(module: str, repeat: int = 5):
+    """
+    Returns the best wall time (ms) of starting the interpreter and importing the module.
+    """
+
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", f"import {module}"], cwd=GAME_FOLDER, check=True, capture_output=True)
+        elapsed = (time.perf_counter() - start) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+
+    return best
+
+
+def main():
+    # First import writes the map cache, later ones measure the usual start
+    import_times("map")
+
+    baseline = startup_time("sys")
+    print(f"Interpreter start: {baseline:.1f} ms")
+
+    for module in MODULES:
+        total, imports, loaded_window_modules = import_times(module)
+        start = startup_time(module)
+
+        print(f"\n{module}: imports {total:.1f} ms, start {start:.1f} ms ({start - baseline:+.1f} ms)")
+        for cumulative, name in imports[1:6]:
+            print(f"  {cumulative:7.1f} ms  {name}")
+
+        if module in HEADLESS_MODULES and loaded_window_modules:
+            print(f"  WARNING: headless module loads {', '.join(loaded_window_modules)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Benchmark of the longest route solver on networks of 45+ connections.
+
+Run from the repository root: python benchmarks/longest_route_benchmark.py
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "../src/game"))
+
+from longest_route import LongestRouteSolver, longest_trail
+from map import Map
+
+
+def europe_network():
+    """
+    All connections of the Europe map.
+    """
+
+    game_map = Map()
+    return [
+        (city1.name, city2.name, len(conn.cost))
+        for conn in game_map.connections
+        for city1, city2 in [list(conn.cities)]
+    ]
+
+
+def player_network(num_cities: int, cycles: int, seed: int = 0):
+    """
+    Tree-like network with a few cycles and random connection lengths, as built by a player during the game.
+    """
+
+    rng = random.Random(seed)
+    edges = [(i, rng.randrange(max(0, i - 4), i), rng.randint(1, 6)) for i in range(1, num_cities)]
+    for _ in range(cycles):
+        city = rng.randrange(num_cities)
+        edges.append((city, min(num_cities - 1, city + rng.randint(2, 8)), rng.randint(1, 6)))
+    return edges
+
+
+def measure(name: str, edges: list, repeat: int = 3):
+    best_time = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        length = longest_trail(edges)
+        elapsed = time.perf_counter() - start
+        best_time = elapsed if best_time is None else min(best_time, elapsed)
+
+    print(f"{name}: {len(edges)} connections, longest route {length}, {best_time * 1000:.2f} ms")
+
+
+class _Connection:
+    """
+    Minimal stand-in for CityConnection used by the incremental benchmark.
+    """
+
+    def __init__(self, city1, city2, length):
+        self.cities = [_City(city1), _City(city2)]
+        self.cost = [None] * length
+
+
+class _City:
+    def __init__(self, name):
+        self.name = name
+
+
+def measure_incremental(name: str, edges: list):
+    """
+    Adds connections one by one and asks for the longest route after every claim, as the game does.
+    """
+
+    solver = LongestRouteSolver()
+    start = time.perf_counter()
+    for city1, city2, length in edges:
+        solver.add_connection(_Connection(city1, city2, length))
+        solver.longest()
+    elapsed = time.perf_counter() - start
+
+    print(f"{name} (incremental, after each of {len(edges)} claims): {elapsed * 1000:.2f} ms total")
+
+
+def main():
+    europe = europe_network()
+    networks = [
+        ("Player network", player_network(46, 3, seed=1)),
+        ("Player network", player_network(55, 5, seed=2)),
+        ("Player network", player_network(80, 8, seed=3)),
+        # Dense part of the map, much harder than any network a player can build with 45 trains
+        ("Europe map, first 40 connections", europe[:40]),
+    ]
+
+    for name, edges in networks:
+        measure(name, edges)
+
+    for name, edges in networks[:3]:
+        measure_incremental(name, edges)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,30 @@
+"""
+Benchmark of the MCTS bot: playouts per second of one move search with 1 and more worker processes.
+
+Run from the repository root: python benchmarks/mcts_benchmark.py
+"""
+
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "../src/game"))
+
+from game_state_benchmark import started_game
+from mcts_player import MCTSPlayer
+
+
+def main():
+    game = started_game(seed=1)
+
+    for workers in (1, 2, 4):
+        bot = MCTSPlayer("MCTS", time_limit=2.0, workers=workers, rng=random.Random(0))
+        bot.choose_action(game)  # Starts the worker processes
+        action = bot.choose_action(game)
+        bot.close()
+
+        print(f"{workers} workers: {bot.last_playouts} playouts ({bot.last_playouts_per_second:,.0f} playouts/s), chose {action}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Benchmark of the event log: cost of recording simulated games, bytes per game,
+decoding speed and seeking to random turns of a game with the replayer.
+
+Run from the repository root: python benchmarks/replay_benchmark.py
+"""
+
+import io
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "../src/game"))
+
+from events import EventLog, read_logs, write_logs
+from replay import Replayer
+from simulate import run_game
+
+POLICY_NAMES = ["greedy", "tickets", "random"]
+
+
+def main():
+    seeds = range(100)
+
+    start = time.perf_counter()
+    for seed in seeds:
+        run_game(seed, POLICY_NAMES)
+    plain = time.perf_counter() - start
+
+    start = time.perf_counter()
+    results = [run_game(seed, POLICY_NAMES, record_events=True) for seed in seeds]
+    recorded = time.perf_counter() - start
+
+    print(f"Simulation: {len(seeds) / plain:.1f} games/s, {len(seeds) / recorded:.1f} games/s with the event log")
+
+    file = io.BytesIO()
+    write_logs(file, [result["events"] for result in results])
+    size = len(file.getvalue())
+    print(f"Event logs: {size / len(seeds):.0f} bytes per game")
+
+    file.seek(0)
+    start = time.perf_counter()
+    events = sum(len(list(event_log)) for event_log in read_logs(file))
+    elapsed = time.perf_counter() - start
+    print(f"Decoding: {events / elapsed:,.0f} events/s")
+
+    rng = random.Random(0)
+    for snapshot_interval in (5, 20, 1000):
+        replayer = Replayer(EventLog(results[0]["events"]), snapshot_interval=snapshot_interval)
+        num_turns = replayer.num_turns  # Replays the whole game once, which takes the snapshots
+
+        turns = [rng.randrange(num_turns + 1) for _ in range(200)]
+        start = time.perf_counter()
+        for turn in turns:
+            replayer.game_at(turn)
+        elapsed = time.perf_counter() - start
+
+        print(
+            f"Seek with a snapshot every {snapshot_interval} turns: {elapsed / len(turns) * 1000:.2f} ms"
+            f" ({len(replayer.snapshots)} snapshots of a game with {num_turns} turns)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Benchmark of the all-pairs shortest paths: precomputation, incremental updates as routes get claimed
+(compared with computing all paths again) and queries.
+
+Run from the repository root: python benchmarks/shortest_paths_benchmark.py
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "../src/game"))
+
+from map import Map
+from shortest_paths import ShortestPaths, all_pairs_shortest_paths
+
+
+def main():
+    compiled = Map().compiled
+    n = compiled.num_cities
+
+    start = time.perf_counter()
+    repeat = 20
+    for _ in range(repeat):
+        all_pairs_shortest_paths(compiled)
+    full = (time.perf_counter() - start) / repeat
+    print(f"All pairs of {n} cities: {full * 1000:.2f} ms")
+
+    # Routes claimed in a random order, a third of them by the player
+    rng = random.Random(0)
+    updates = 0
+    start = time.perf_counter()
+    for _ in range(repeat):
+        shortest_paths = ShortestPaths(compiled)
+        routes = list(range(compiled.num_routes))
+        rng.shuffle(routes)
+
+        for route_id in routes[: compiled.num_routes // 2]:
+            if rng.random() < 1 / 3:
+                shortest_paths.add_own_route(route_id)
+            else:
+                shortest_paths.remove_route(route_id)
+            updates += 1
+    update = (time.perf_counter() - start) / updates
+    print(f"Update after a claim: {update * 1000:.3f} ms ({full / update:.0f}x faster than computing again)")
+
+    queries = 100_000
+    pairs = [(rng.randrange(n), rng.randrange(n)) for _ in range(1000)]
+    start = time.perf_counter()
+    for i in range(queries):
+        shortest_paths.distance(*pairs[i % 1000])
+    elapsed = time.perf_counter() - start
+    print(f"Distance query: {elapsed / queries * 1e6:.3f} us")
+
+    start = time.perf_counter()
+    for i in range(queries // 10):
+        shortest_paths.path(*pairs[i % 1000])
+    elapsed = time.perf_counter() - start
+    print(f"Path query: {elapsed / (queries // 10) * 1e6:.3f} us")
+
+
+if __name__ == "__main__":
+    main()
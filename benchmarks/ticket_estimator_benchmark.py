@@ -0,0 +1,46 @@
+"""
+Benchmark of the ticket completion estimator: latency and number of samples of estimating
+three offered tickets at several points of a game played by the ticket bots.
+
+Run from the repository root: python benchmarks/ticket_estimator_benchmark.py
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "../src/game"))
+
+from policies import TicketShortestPathPolicy
+from simulate import create_game
+from ticket_estimator import TicketEstimator
+
+
+def main():
+    for turns in (0, 30, 60):
+        game = create_game(3, seed=1)
+        game.start()
+        rng = random.Random(1)
+        for player in game.players:
+            player.policy = TicketShortestPathPolicy(rng)
+
+        while not game.game_over and (game.destination_tickets_to_choose or game.turn_number < turns):
+            player = game.players[game.current_player_index]
+            game.apply(player.policy.choose_action(game, game.legal_actions()))
+
+        player = game.players[game.current_player_index]
+        tickets = list(game.destination_tickets_deck.cards)[-3:]
+        estimator = TicketEstimator(game.map.compiled, rng=random.Random(0))
+
+        start = time.perf_counter()
+        estimates = estimator.estimate(game, player, tickets)
+        elapsed = time.perf_counter() - start
+
+        print(f"Turn {game.turn_number}, {player.trains} trains: {elapsed * 1000:.1f} ms, {estimator.last_samples} samples")
+        for ticket, (probability, expected_points) in zip(tickets, estimates):
+            print(f"  {ticket.start_city} - {ticket.end_city} ({ticket.points}): {probability:.0%}, {expected_points:.1f} points")
+
+
+if __name__ == "__main__":
+    main()
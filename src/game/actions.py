@@ -0,0 +1,139 @@
+class Value:
+    """
+    Base class of immutable values: equal if they have the same type and fields.
+    Plain classes with __slots__ are used instead of dataclasses, which would add
+    noticeable import time to every headless worker.
+    """
+
+    __slots__ = ()
+
+    def __init__(self, *values):
+        if len(values) != len(self.__slots__):
+            raise TypeError(f"{type(self).__name__} takes {len(self.__slots__)} arguments, got {len(values)}")
+
+        for name, value in zip(self.__slots__, values):
+            object.__setattr__(self, name, value)
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def values(self):
+        """
+        Returns tuple of the field values.
+        """
+
+        return tuple(getattr(self, name) for name in self.__slots__)
+
+    def __eq__(self, other):
+        return type(self) is type(other) and self.values() == other.values()
+
+    def __hash__(self):
+        return hash((type(self), self.values()))
+
+    def __reduce__(self):
+        return type(self), self.values()
+
+    def __repr__(self):
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"{type(self).__name__}({fields})"
+
+
+class Action(Value):
+    """
+    Base class of player actions passed from the input (GUI) to the game logic.
+    """
+
+    __slots__ = ()
+
+
+class DrawTrainCard(Action):
+    """
+    Draw a card from the top of the train cards deck.
+    """
+
+    __slots__ = ()
+
+
+class DrawOpenCard(Action):
+    """
+    Draw the open card at the given index.
+    """
+
+    __slots__ = ("index",)
+    __match_args__ = __slots__
+
+
+class DrawDestinationTickets(Action):
+    """
+    Draw destination tickets to choose from.
+    """
+
+    __slots__ = ()
+
+
+class ChooseDestinationTicket(Action):
+    """
+    Keep the drawn destination ticket at the given index.
+    """
+
+    __slots__ = ("index",)
+    __match_args__ = __slots__
+
+
+class KeepDestinationTickets(Action):
+    """
+    Keep the drawn destination tickets at the given indices (tuple), the rest is returned to the deck.
+    """
+
+    __slots__ = ("indices",)
+    __match_args__ = __slots__
+
+
+class SelectCities(Action):
+    """
+    Two cities were selected, the connection between them should be claimed.
+    """
+
+    __slots__ = ("city1", "city2")
+    __match_args__ = __slots__
+
+
+class ChooseParallelConnection(Action):
+    """
+    Choose one of two parallel connections (0 or 1) shown to the player.
+    """
+
+    __slots__ = ("index",)
+    __match_args__ = __slots__
+
+
+class ClaimConnection(Action):
+    """
+    Claim the given connection.
+    Compared by the route id, identical parallel connections are equal as CityConnection.
+    """
+
+    __slots__ = ("connection",)
+    __match_args__ = __slots__
+
+    def __eq__(self, other):
+        return type(self) is type(other) and self.connection.id == other.connection.id
+
+    def __hash__(self):
+        return hash((ClaimConnection, self.connection.id))
+
+
+class Skip(Action):
+    """
+    Click outside of any clickable zone.
+    """
+
+    __slots__ = ()
+
+
+class QuitGame(Action):
+    """
+    The window was closed.
+    """
+
+    __slots__ = ()
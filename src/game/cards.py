@@ -1,7 +1,9 @@
+from collections import deque
 from enum import Enum
-from random import shuffle
-import yaml
-import os
+from random import Random
+
+from events import DeckReshuffled
+
 
 class TrainCard(Enum):
     PINK = 1
@@ -19,6 +21,109 @@ class TrainCard(Enum):
         return f"{self.name}"
 
 
+# Length of card count vectors (hands, route costs): index is TrainCard value, index 0 is not used
+CARD_VECTOR_SIZE = max(card.value for card in TrainCard) + 1
+
+# TrainCard by its value, for turning count vectors back to cards
+CARDS_BY_VALUE = [None] + sorted(TrainCard, key=lambda card: card.value)
+
+# Values of the colored cards, which can pay a grey route
+COLOR_VALUES = [card.value for card in TrainCard if card not in (TrainCard.LOCOMOTIVE, TrainCard.GREY)]
+
+
+class Hand:
+    """
+    Train cards of a player stored as a fixed-length vector of counts indexed by TrainCard value,
+    so checking and paying a route cost does not depend on the number of cards in the hand.
+    Iterating gives the cards as a list (grouped by color), which is what the GUI draws.
+    """
+
+    def __init__(self, cards: list[TrainCard] = ()):
+        self.counts = [0] * CARD_VECTOR_SIZE
+        self.size = 0
+
+        self.extend(cards)
+
+    def append(self, card: TrainCard):
+        """
+        Adds a card to the hand.
+        """
+
+        self.counts[card.value] += 1
+        self.size += 1
+
+    def extend(self, cards: list[TrainCard]):
+        """
+        Adds all cards to the hand.
+        """
+
+        for card in cards:
+            self.append(card)
+
+    def remove(self, card: TrainCard):
+        """
+        Removes one card from the hand, raises ValueError if there is no such card.
+        """
+
+        if not self.counts[card.value]:
+            raise ValueError(f"No {card.name} card in the hand")
+
+        self.counts[card.value] -= 1
+        self.size -= 1
+
+    def count(self, card: TrainCard):
+        """
+        Returns the number of cards of the given color.
+        """
+
+        return self.counts[card.value]
+
+    def contains(self, cost) -> bool:
+        """
+        Checks if the hand has at least the given count vector of cards.
+        """
+
+        counts = self.counts
+        return all(counts[value] >= count for value, count in enumerate(cost) if count)
+
+    def spend(self, payment) -> list[TrainCard]:
+        """
+        Removes the count vector of cards from the hand, returns the removed cards.
+        Raises ValueError if the hand does not contain them, the hand is not changed then.
+        """
+
+        if not self.contains(payment):
+            raise ValueError("Not enough cards in the hand for the payment")
+
+        spent = []
+        for value, count in enumerate(payment):
+            if count:
+                self.counts[value] -= count
+                self.size -= count
+                spent.extend([CARDS_BY_VALUE[value]] * count)
+
+        return spent
+
+    def cards(self) -> list[TrainCard]:
+        """
+        Returns list of the cards, grouped by color.
+        """
+
+        return [card for card in CARDS_BY_VALUE[1:] for _ in range(self.counts[card.value])]
+
+    def __iter__(self):
+        return iter(self.cards())
+
+    def __len__(self):
+        return self.size
+
+    def __contains__(self, card: TrainCard):
+        return self.counts[card.value] > 0
+
+    def __str__(self):
+        return f"[{', '.join(card.name for card in self)}]"
+
+
 class DestinationTicketCard:
     def __init__(self, start_city: str, end_city: str, points: int):
         self.start_city = start_city
@@ -29,35 +134,11 @@ class DestinationTicketCard:
     def is_accomplished(self, player: "Player"):
         """
         Checks if the destination ticket is accomplished for the given player.
-        DFS is used to check if there is a path between the start and end cities.
+        Player keeps cities joined by the claimed connections in a disjoint-set,
+        so it is enough to check if both cities are in the same set.
         """
-        from player import Player
-
-        start_city = player.get_city(self.start_city)
-        end_city = player.get_city(self.end_city)
-
-        if start_city == None or end_city == None:
-            return False
-
-        # Check if the cities are connected
-        def dfs(city, visited):
-            print(f"DFS visiting city: {city.name}")
-            if city == end_city:
-                return True
 
-            visited.add(city)
-            for neighbor in city.get_connected_cities():
-                if neighbor not in visited:
-                    if dfs(neighbor, visited):
-                        return True
-            
-            return False
-
-        visited = set()
-        result = dfs(start_city, visited)
-        print(f"Result of DFS: {'Accomplished' if result else 'Not accomplished'}")
-        return result
-    
+        return player.are_cities_connected(self.start_city, self.end_city)
 
     def __str__(self):
         return (
@@ -67,33 +148,70 @@ class DestinationTicketCard:
 
 
 class Deck:
-    def __init__(self):
-        self.cards = []
+    """
+    Draw pile with the top at the right end of a deque, so drawing from the top
+    and adding to the top or to the bottom take O(1).
+    Returned cards go to the discard pile, which is shuffled into the draw pile only when it runs empty.
+    """
+
+    def __init__(self, cards=(), rng: Random = None):
+        self.cards = deque(cards)
+        self.discard_pile = []
+        self.rng = rng or Random()  # Random generator used for shuffling, seed it for reproducible games
+        self.event_log = None  # EventLog recording the reshuffles (see Game.record_events)
+        self.reshuffle_seeds = deque()  # Seeds of the next reshuffles, given by the replay of a recorded game
 
     def shuffle(self):
         """
         Shuffles the deck of cards.
         """
 
-        shuffle(self.cards)
+        # Shuffling a deque in place would index its middle, which is O(n)
+        cards = list(self.cards)
+        self.rng.shuffle(cards)
+        self.cards = deque(cards)
+
+    def can_draw(self):
+        """
+        Checks if there is any card to draw, including the discard pile.
+        """
+
+        return bool(self.cards or self.discard_pile)
 
     def draw_card(self):
         """
         Draws a card from the deck."""
 
+        if not self.cards and self.discard_pile:
+            self.reshuffle_discard_pile()
+
         return self.cards.pop() if self.cards else None
 
+    def reshuffle_discard_pile(self):
+        """
+        Shuffles the discard pile and puts it under the draw pile.
+        The shuffle has its own seed drawn from the deck generator, so a replay repeats it from the seed alone.
+        """
+
+        seed = self.reshuffle_seeds.popleft() if self.reshuffle_seeds else self.rng.getrandbits(32)
+
+        Random(seed).shuffle(self.discard_pile)
+        self.cards.extendleft(reversed(self.discard_pile))
+        self.discard_pile = []
+
+        if self.event_log is not None:
+            self.event_log.append(DeckReshuffled(seed))
+
     def return_cards(self, cards: list[TrainCard]):
         """
-        Returns a list of cards to the deck and shuffles it.
+        Returns a list of cards to the discard pile.
         """
 
-        self.cards.extend(cards)
-        self.shuffle()
+        self.discard_pile.extend(cards)
 
     def add_card(self, card: TrainCard):
         """
-        Adds a card to the deck.
+        Adds a card to the top of the deck.
         """
 
         self.cards.append(card)
@@ -103,21 +221,26 @@ class Deck:
         Adds a card to the bottom of the deck.
         """
 
-        self.cards.insert(0, card)
+        self.cards.appendleft(card)
 
 
 class TrainCardsDeck(Deck):
-    def __init__(self):
-        self.cards = [
-            TrainCard.PINK,
-            TrainCard.WHITE,
-            TrainCard.BLACK,
-            TrainCard.BLUE,
-            TrainCard.YELLOW,
-            TrainCard.ORANGE,
-            TrainCard.GREEN,
-            TrainCard.RED,
-        ] * 12 + [TrainCard.LOCOMOTIVE] * 14
+    def __init__(self, rng: Random = None):
+        super().__init__(
+            [
+                TrainCard.PINK,
+                TrainCard.WHITE,
+                TrainCard.BLACK,
+                TrainCard.BLUE,
+                TrainCard.YELLOW,
+                TrainCard.ORANGE,
+                TrainCard.GREEN,
+                TrainCard.RED,
+            ]
+            * 12
+            + [TrainCard.LOCOMOTIVE] * 14,
+            rng,
+        )
         self.shuffle()
 
 
@@ -131,12 +254,11 @@ class DestinationTicketsDeck(Deck):
     def __init__(
         self,
         cards: list[TrainCard] = [],
-        config_file: str = os.path.join(
-            os.path.dirname(__file__), "../config/set_europe_close_up/europe_map_close_up.yaml"
-        ),
+        config_file: str = None,  # map_config.DEFAULT_CONFIG_FILE if None
+        rng: Random = None,
     ):
 
-        self.cards = cards
+        super().__init__(cards, rng)
 
         if not cards:
             self.init_deck_from_config(config_file)
@@ -144,18 +266,15 @@ class DestinationTicketsDeck(Deck):
 
         self.screen_position = (0.9, 0.4) # From 0 to 1. 0, 0 is the top left corner, 1, 1 is the bottom right corner
 
-    def init_deck_from_config(self, config_file: str):
+    def init_deck_from_config(self, config_file: str = None):
         """
-        Initializes the deck from a config file.
+        Initializes the deck from a config file, the default map if it is None.
         """
 
-        with open(config_file, "r") as file:
-            data = yaml.safe_load(file)
-
-        for ticket_data in data["tickets"]:
+        # Imported here, map_config depends on this module
+        from map_config import DEFAULT_CONFIG_FILE, MapConfig
 
-            city1_name, city2_name = ticket_data["cities"]
-            points = ticket_data["points"]
+        for city1_name, city2_name, points in MapConfig.load(config_file or DEFAULT_CONFIG_FILE).tickets:
 
             ticket = DestinationTicketCard(city1_name, city2_name, points)
             self.cards.append(ticket)
@@ -167,8 +286,9 @@ class DestinationTicketsDeck(Deck):
 
 
 class OpenCardsDeck(Deck):
-    def __init__(self, train_cards_deck: TrainCardsDeck = None):
-        self.cards = []
+    def __init__(self, train_cards_deck: TrainCardsDeck = None, rng: Random = None):
+        super().__init__(rng=rng)
+        self.cards = []  # Open card slots, list for indexing by the GUI
         self.train_cards_deck = train_cards_deck
         self.draw_initial_cards()
         self.screen_position = (0.6, 0.02) # From 0 to 1. 0, 0 is the top left corner, 1, 1 is the bottom right corner
@@ -180,12 +300,29 @@ class OpenCardsDeck(Deck):
     def draw_card(self, index: int):
         """
         Draws a card from the open cards deck at the specified index.
+        The slot is refilled from the top of the train cards deck, so other open cards keep their places.
+        With no train card left the slot stays empty (None) until refill().
         """
 
         if index < 0 or index >= len(self.cards):
             raise IndexError("Index out of range")
 
-        return self.cards.pop(index)
+        card = self.cards[index]
+        if card is None:
+            raise ValueError("Open card slot is empty")
+
+        self.cards[index] = self.train_cards_deck.draw_card() if self.train_cards_deck else None
+
+        return card
+
+    def refill(self):
+        """
+        Fills the empty slots from the train cards deck, called when cards came back to its discard pile.
+        """
+
+        for i, card in enumerate(self.cards):
+            if card is None:
+                self.cards[i] = self.train_cards_deck.draw_card()
 
     def draw_initial_cards(self):
         """
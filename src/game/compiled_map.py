@@ -0,0 +1,108 @@
+from array import array
+
+from cards import CARD_VECTOR_SIZE, TrainCard
+from shortest_paths import all_pairs_shortest_paths
+
+# Points for claiming a route of the given length (CityConnection.get_score_for_claiming)
+ROUTE_POINTS = {1: 1, 2: 2, 3: 4, 4: 7, 5: 10, 6: 15}
+
+
+class CompiledMap:
+    """
+    Immutable integer-indexed copy of the map graph for fast queries.
+    Cities and connections (routes) get dense ids equal to their positions in Map.cities and Map.connections.
+    Adjacency is stored in CSR form: neighbours of city 'c' are at positions
+    adjacency_offsets[c] .. adjacency_offsets[c + 1] of adjacency_cities and adjacency_routes.
+    Distances and first routes of the shortest paths between all pairs of cities are precomputed
+    in flat arrays 'distances' and 'next_routes' (index city1 * num_cities + city2).
+    Only arrays, tuples and dicts are used, so the structure can be pickled and sent to worker processes.
+    """
+
+    def __init__(self, cities: list[tuple[str, tuple[int, int]]], routes: list[tuple[str, str, list[TrainCard]]]):
+        """
+        'cities' - (name, point) of every city
+        'routes' - (city1 name, city2 name, cost) of every connection
+        """
+
+        self.city_names = tuple(name for name, _ in cities)
+        self.city_ids = {name: i for i, name in enumerate(self.city_names)}  # City name -> city id
+        self.city_points = tuple(point for _, point in cities)
+
+        self.route_city1 = array("H")
+        self.route_city2 = array("H")
+        self.route_lengths = array("B")
+        self.route_points = array("B")
+        self.route_costs = []  # Route id -> cost vector (number of cards of every TrainCard value)
+
+        # Route id -> (color value, number of color cards, number of locomotives), color is GREY for grey routes.
+        # Routes with the same signature are paid the same way.
+        self.route_signatures = []
+
+        for city1_name, city2_name, route_cost in routes:
+            city1, city2 = sorted((self.city_ids[city1_name], self.city_ids[city2_name]))
+            self.route_city1.append(city1)
+            self.route_city2.append(city2)
+            self.route_lengths.append(len(route_cost))
+            self.route_points.append(ROUTE_POINTS.get(len(route_cost), 0))
+
+            cost = array("B", bytes(CARD_VECTOR_SIZE))
+            for card in route_cost:
+                cost[card.value] += 1
+            self.route_costs.append(cost)
+
+            colors = [card.value for card in route_cost if card != TrainCard.LOCOMOTIVE]
+            color = colors[0] if colors else 0
+            self.route_signatures.append((color, len(colors), len(route_cost) - len(colors)))
+
+        self.route_costs = tuple(self.route_costs)
+        self.route_signatures = tuple(self.route_signatures)
+
+        # Every route is stored twice, once for every end city
+        degrees = [0] * len(self.city_names)
+        for city1, city2 in zip(self.route_city1, self.route_city2):
+            degrees[city1] += 1
+            degrees[city2] += 1
+
+        self.adjacency_offsets = array("I", [0])
+        for degree in degrees:
+            self.adjacency_offsets.append(self.adjacency_offsets[-1] + degree)
+
+        self.adjacency_cities = array("H", bytes(2 * self.adjacency_offsets[-1]))
+        self.adjacency_routes = array("H", bytes(2 * self.adjacency_offsets[-1]))
+
+        positions = list(self.adjacency_offsets[:-1])
+        for route_id, (city1, city2) in enumerate(zip(self.route_city1, self.route_city2)):
+            for city, neighbour in ((city1, city2), (city2, city1)):
+                self.adjacency_cities[positions[city]] = neighbour
+                self.adjacency_routes[positions[city]] = route_id
+                positions[city] += 1
+
+        # All-pairs shortest paths (see shortest_paths.ShortestPaths), stored with the map cache
+        self.distances, self.next_routes = all_pairs_shortest_paths(self)
+
+    @property
+    def num_cities(self):
+        return len(self.city_names)
+
+    @property
+    def num_routes(self):
+        return len(self.route_lengths)
+
+    def routes_between(self, city1_id: int, city2_id: int):
+        """
+        Returns list of ids of the routes (one or two parallel ones) between both cities.
+        """
+
+        routes = []
+        for position in range(self.adjacency_offsets[city1_id], self.adjacency_offsets[city1_id + 1]):
+            if self.adjacency_cities[position] == city2_id:
+                routes.append(self.adjacency_routes[position])
+
+        return routes
+
+    def route_cities(self, route_id: int):
+        """
+        Returns ids of both cities of the route.
+        """
+
+        return self.route_city1[route_id], self.route_city2[route_id]
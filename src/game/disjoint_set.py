@@ -0,0 +1,66 @@
+class DisjointSet:
+    """
+    Union-find structure over hashable items (e.g. city names).
+    Used to keep track which cities are connected by the routes of a player.
+    """
+
+    def __init__(self):
+        self.parent = {}
+        self.size = {}
+
+    def add(self, item):
+        """
+        Adds the item as a new one-element set, if it is not known yet.
+        """
+
+        if item not in self.parent:
+            self.parent[item] = item
+            self.size[item] = 1
+
+    def find(self, item):
+        """
+        Returns the representative of the item's set, None for unknown items.
+        """
+
+        if item not in self.parent:
+            return None
+
+        root = item
+        while self.parent[root] != root:
+            root = self.parent[root]
+
+        # Path compression
+        while self.parent[item] != root:
+            self.parent[item], item = root, self.parent[item]
+
+        return root
+
+    def union(self, item1, item2):
+        """
+        Joins the sets of both items, adding the items if needed.
+        """
+
+        self.add(item1)
+        self.add(item2)
+
+        root1 = self.find(item1)
+        root2 = self.find(item2)
+
+        if root1 == root2:
+            return
+
+        # Union by size
+        if self.size[root1] < self.size[root2]:
+            root1, root2 = root2, root1
+
+        self.parent[root2] = root1
+        self.size[root1] += self.size[root2]
+
+    def connected(self, item1, item2):
+        """
+        Checks if both items are in the same set.
+        """
+
+        root1 = self.find(item1)
+
+        return root1 is not None and root1 == self.find(item2)
@@ -0,0 +1,230 @@
+from actions import Value
+
+EVENT_LOG_VERSION = 1  # First byte of every encoded log
+
+
+class GameEvent(Value):
+    """
+    Base class of the state transitions of a game, recorded by Game into its event_log.
+    Cities, routes and cards are stored as ids of the compiled map (CompiledMap) and TrainCard values.
+    'formats' gives the encoding of every field:
+    'u' unsigned int, 'l' tuple of unsigned ints, 't' tuple of tickets (start city, end city, points).
+    """
+
+    __slots__ = ()
+    formats = ""
+
+
+class GameStarted(GameEvent):
+    """
+    Decks after the initial shuffle, before the cards are dealt. Decks are listed from the bottom to the top.
+    """
+
+    __slots__ = ("num_players", "first_player", "open_cards", "train_deck", "tickets_deck")
+    __match_args__ = __slots__
+    formats = "uullt"
+
+
+class TrainCardDrawn(GameEvent):
+    __slots__ = ("player", "card")
+    __match_args__ = __slots__
+    formats = "uu"
+
+
+class OpenCardDrawn(GameEvent):
+    __slots__ = ("player", "index", "card")
+    __match_args__ = __slots__
+    formats = "uuu"
+
+
+class TicketsDrawn(GameEvent):
+    """
+    Destination tickets offered to the player, during the setup or by the player's action.
+    """
+
+    __slots__ = ("player", "tickets")
+    __match_args__ = __slots__
+    formats = "ut"
+
+
+class TicketsKept(GameEvent):
+    __slots__ = ("player", "indices")
+    __match_args__ = __slots__
+    formats = "ul"
+
+
+class RouteClaimed(GameEvent):
+    """
+    Route claimed by the player, 'cards' are the values of the paid cards.
+    """
+
+    __slots__ = ("player", "route", "cards")
+    __match_args__ = __slots__
+    formats = "uul"
+
+
+class DeckReshuffled(GameEvent):
+    """
+    Discard pile shuffled under the train cards deck, seed of the shuffle (see Deck.reshuffle_discard_pile).
+    """
+
+    __slots__ = ("seed",)
+    __match_args__ = __slots__
+    formats = "u"
+
+
+class GameEnded(GameEvent):
+    __slots__ = ("scores",)
+    __match_args__ = __slots__
+    formats = "l"
+
+
+# Event type id (the first varint of an encoded event) -> event class
+EVENT_TYPES = (
+    GameStarted,
+    TrainCardDrawn,
+    OpenCardDrawn,
+    TicketsDrawn,
+    TicketsKept,
+    RouteClaimed,
+    DeckReshuffled,
+    GameEnded,
+)
+EVENT_TYPE_IDS = {event_type: i for i, event_type in enumerate(EVENT_TYPES)}
+
+
+def write_varint(buffer: bytearray, value: int):
+    """
+    Appends the unsigned int in 7 bits per byte, the high bit is set on all bytes but the last.
+    """
+
+    while value >= 0x80:
+        buffer.append(value & 0x7F | 0x80)
+        value >>= 7
+
+    buffer.append(value)
+
+
+def read_varint(data, position: int):
+    """
+    Returns (value, position after it).
+    """
+
+    value = 0
+    shift = 0
+
+    while True:
+        byte = data[position]
+        position += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, position
+        shift += 7
+
+
+class EventLog:
+    """
+    Append-only log of the events of one game, kept encoded: every event is its type id
+    and the fields as varints (see GameEvent.formats), so most events take 3 or 4 bytes.
+    Iterating decodes the events.
+    """
+
+    def __init__(self, data: bytes = None):
+        if data is None:
+            self.data = bytearray([EVENT_LOG_VERSION])
+        else:
+            if not data or data[0] != EVENT_LOG_VERSION:
+                raise ValueError("Unsupported event log version")
+            self.data = bytearray(data)
+
+    def append(self, event: GameEvent):
+        data = self.data
+        write_varint(data, EVENT_TYPE_IDS[type(event)])
+
+        for name, field_format in zip(event.__slots__, event.formats):
+            value = getattr(event, name)
+
+            match field_format:
+                case "u":
+                    write_varint(data, value)
+                case "l":
+                    write_varint(data, len(value))
+                    for item in value:
+                        write_varint(data, item)
+                case "t":
+                    write_varint(data, len(value))
+                    for ticket in value:
+                        for item in ticket:
+                            write_varint(data, item)
+
+    def __iter__(self):
+        data = self.data
+        position = 1
+
+        while position < len(data):
+            type_id, position = read_varint(data, position)
+            event_type = EVENT_TYPES[type_id]
+            values = []
+
+            for field_format in event_type.formats:
+                if field_format == "u":
+                    value, position = read_varint(data, position)
+                    values.append(value)
+                    continue
+
+                size, position = read_varint(data, position)
+                items = []
+
+                match field_format:
+                    case "l":
+                        for _ in range(size):
+                            item, position = read_varint(data, position)
+                            items.append(item)
+                    case "t":
+                        for _ in range(size):
+                            start, position = read_varint(data, position)
+                            end, position = read_varint(data, position)
+                            points, position = read_varint(data, position)
+                            items.append((start, end, points))
+
+                values.append(tuple(items))
+
+            yield event_type(*values)
+
+    def __bytes__(self):
+        return bytes(self.data)
+
+    def __len__(self):
+        """
+        Size of the encoded log in bytes.
+        """
+
+        return len(self.data)
+
+
+def write_logs(file, logs):
+    """
+    Writes the encoded logs of many games into a binary file, every log is prefixed by its size.
+    """
+
+    buffer = bytearray()
+    for log in logs:
+        data = bytes(log)
+        write_varint(buffer, len(data))
+        buffer += data
+
+    file.write(buffer)
+
+
+def read_logs(file):
+    """
+    Yields the EventLog of every game of a file written by write_logs.
+    """
+
+    data = file.read()
+    position = 0
+
+    while position < len(data):
+        size, position = read_varint(data, position)
+        yield EventLog(data[position : position + size])
+        position += size
@@ -1,16 +1,32 @@
-from collections import Counter
-from map import Map, City, CityConnection, get_city_by_name
+from map import Map, CityConnection
 from cards import (
     DestinationTicketCard,
+    Hand,
     TrainCardsDeck,
     DestinationTicketsDeck,
     TrainCard,
     OpenCardsDeck,
 )
 from player import Player
-from gui import GUI
-from threading import Thread
-import time
+from payment import PaymentPlanner
+from actions import (
+    ChooseDestinationTicket,
+    ChooseParallelConnection,
+    ClaimConnection,
+    DrawDestinationTickets,
+    DrawOpenCard,
+    DrawTrainCard,
+    KeepDestinationTickets,
+    QuitGame,
+    SelectCities,
+)
+from events import GameEnded, GameStarted, OpenCardDrawn, RouteClaimed, TicketsDrawn, TicketsKept, TrainCardDrawn
+from itertools import combinations
+from random import Random
+from queue import Empty
+from threading import Event, Thread
+
+LONGEST_ROUTE_BONUS = 10
 
 
 class Game:
@@ -26,9 +42,12 @@ class Game:
         open_cards_deck: OpenCardsDeck,
         current_player_index: int,
         players: list[Player] = [],
+        rng: Random = None,
     ):
         self.players = players
+        self.rng = rng or Random()  # Game randomness, shared with the decks for reproducible games
         self.map = map
+        self.payment_planner = PaymentPlanner(map.compiled)  # Best payments of routes, looked up by route cost signature
         self.train_cards_deck = train_cards_deck
         self.destination_tickets_deck = destination_tickets_deck
         self.open_cards_deck = open_cards_deck
@@ -37,6 +56,16 @@ class Game:
         self.game_over = False
         self.gui = None
         self.destination_tickets_to_choose = []
+        self.action_timeout = 1.0  # Seconds to block while waiting for a GUI action
+        self.quit_requested = False
+        self.verbose = True  # Print game messages
+        self.event_log = None  # EventLog of the state transitions, see record_events
+
+        # Turn state used by the headless engine (legal_actions / apply)
+        self.cards_drawn_this_turn = []
+        self.tickets_need_to_take = 0
+        self.setup_players_left = 0
+        self.last_round_turns_left = None
 
     def __str__(self):
         players_str = "\n".join(str(player) for player in self.players)
@@ -52,6 +81,59 @@ class Game:
             f"Game Over: {self.game_over}"
         )
 
+    def log(self, message: str):
+        """
+        Prints the game message if the game is verbose.
+        """
+
+        if self.verbose:
+            print(message)
+
+    def record_events(self, event_log: "EventLog"):
+        """
+        Starts recording the state transitions of the headless engine into the event log,
+        call it before start(). See replay.Replayer for reconstructing the game from the log.
+        """
+
+        self.event_log = event_log
+        self.train_cards_deck.event_log = event_log
+
+    def ticket_ids(self, tickets: list[DestinationTicketCard]):
+        """
+        Returns tuple of (start city id, end city id, points) of the tickets, as stored in the event log.
+        """
+
+        city_ids = self.map.compiled.city_ids
+        return tuple((city_ids[ticket.start_city], city_ids[ticket.end_city], ticket.points) for ticket in tickets)
+
+    def mark_dirty(self, *regions: str):
+        """
+        Notifies the GUI (if there is one) which screen regions have changed.
+        """
+
+        if self.gui is not None:
+            self.gui.mark_dirty(*regions)
+
+    def wait_for_action(self):
+        """
+        Blocks until the player makes an action in the GUI.
+        Returns None if no action was made within 'action_timeout' seconds.
+        """
+
+        if self.quit_requested:
+            return QuitGame()
+
+        try:
+            action = self.gui.get_player_action(timeout=self.action_timeout)
+        except Empty:
+            return None
+
+        if isinstance(action, QuitGame):
+            self.quit_requested = True
+            self.game_over = True
+
+        return action
+
     def setup_game(self):
         """
         Sets up the game by shuffling and dealing cards.
@@ -62,12 +144,17 @@ class Game:
         # Drawing initial train cards and destination tickets for each player
         for player in self.players:
             print(f"Drawing initial cards for {player.name}...")
-            player.train_cards = [self.train_cards_deck.draw_card() for _ in range(4)]
+            player.train_cards = Hand(self.train_cards_deck.draw_card() for _ in range(4))
             self.draw_destination_tickets(player, 3, 2)
+
+            if self.quit_requested:
+                return
+
             self.turn_number += 1
             self.current_player_index = (self.current_player_index + 1) % len(self.players)
 
-            
+        self.mark_dirty("all")
+
 
     def play_game(self):
         """
@@ -77,18 +164,40 @@ class Game:
 
         while not self.game_over:
             self.play_turn()
-            
-            if self.if_start_last_round():
-                self.game_over = True
 
+            if self.quit_requested:
+                break
+
+            if self.if_start_last_round():
                 for _ in range(len(self.players)):
                     self.play_turn()
 
+                    if self.quit_requested:
+                        break
+
+                self.game_over = True
+                self.finish_game()
                 self.print_final_scores()
                 break
 
         print("\nGame Over!")
 
+    def finish_game(self):
+        """
+        Adds end of game bonuses: 10 points for the longest continuous route (for every player in a tie).
+        """
+
+        longest_routes = [player.get_longest_route() for player in self.players]
+        longest = max(longest_routes, default=0)
+
+        for player, length in zip(self.players, longest_routes):
+            if longest and length == longest:
+                player.score += LONGEST_ROUTE_BONUS
+                self.log(f"{player.name} has the longest route ({length} trains): +{LONGEST_ROUTE_BONUS} points")
+
+        if self.event_log is not None:
+            self.event_log.append(GameEnded(tuple(player.score for player in self.players)))
+
     def print_final_scores(self):
         """
         Prints the final scores of all players.
@@ -103,6 +212,9 @@ class Game:
         drew_cards = 0
 
         while drew_cards < 2:
+            if drew_cards and not self.can_draw_second_card():
+                break
+
             print(f"{self.open_cards_deck}")
 
             choice = int(
@@ -111,13 +223,22 @@ class Game:
             match choice:
 
                 case 1:
-                    player.train_cards.append(self.train_cards_deck.draw_card())
+                    card = self.train_cards_deck.draw_card()
+                    if card is None:
+                        print("The train cards deck is empty. Please draw an open card.")
+                        continue
+
+                    player.train_cards.append(card)
                     drew_cards += 1
                 case 2:
                     index = int(
                         input("Choose an index of the open card to draw (0-4): ")
                     )
-                    if index < 0 or index >= len(self.open_cards_deck.cards):
+                    if (
+                        index < 0
+                        or index >= len(self.open_cards_deck.cards)
+                        or self.open_cards_deck.cards[index] is None
+                    ):
                         print("Invalid index. Please try again.")
                         continue
 
@@ -133,7 +254,6 @@ class Game:
                     card = self.open_cards_deck.draw_card(index)
 
                     player.train_cards.append(card)
-                    self.open_cards_deck.add_card(self.train_cards_deck.draw_card())
                     drew_cards += 1
 
                     if card == TrainCard.LOCOMOTIVE:
@@ -142,6 +262,8 @@ class Game:
                 case _:
                     print("Invalid choice. Please try again.")
 
+        self.mark_dirty("hand", "open_cards", "decks")
+
     def draw_destination_tickets(
         self, player: Player, num_tickets: int = 3, need_to_take: int = 1, terminal_mode: bool = False
     ):
@@ -149,6 +271,16 @@ class Game:
         Drawing destination tickets from deck.
         At least 'need_to_take' ticket needs to be taken.
         """
+        if player.policy is not None:
+            if not self.offer_destination_tickets(num_tickets, need_to_take):
+                print("Not more destination tickets available.")
+                return None
+
+            action = player.policy.choose_action(self, self.legal_actions())
+            tickets = [self.destination_tickets_to_choose[i] for i in action.indices]
+            self.keep_destination_tickets(player, action.indices)
+            return tickets
+
         temp_cards = []
         for _ in range(num_tickets):
             card = self.destination_tickets_deck.draw_card()
@@ -164,7 +296,9 @@ class Game:
 
 
         self.destination_tickets_to_choose = temp_cards
-        self.gui.if_draw_destination_tickets_to_choose = True
+        if self.gui is not None:
+            self.gui.if_draw_destination_tickets_to_choose = True
+        self.mark_dirty("tickets_to_choose")
 
         if terminal_mode:
             choice = input("Do you want to keep all of the drawn tickets? (y/n): ")
@@ -193,11 +327,18 @@ class Game:
                         if choice.lower() == "y":
                             tickets_for_taking.append(ticket)
                             taken_cards_counter += 1
-                
-                    destination_ticket_index, action_name = self.gui.get_player_action()
-                    
-                    if type(destination_ticket_index) == int:
-                        ticket = self.destination_tickets_to_choose[destination_ticket_index]
+                        continue
+
+                    # Waiting for a ticket click, any other click ends choosing
+                    action = None
+                    while action is None:
+                        action = self.wait_for_action()
+
+                    if self.quit_requested:
+                        return tickets_for_taking
+
+                    if isinstance(action, ChooseDestinationTicket):
+                        ticket = self.destination_tickets_to_choose[action.index]
                         if ticket in tickets_for_taking:
                             break
 
@@ -215,7 +356,9 @@ class Game:
                 self.destination_tickets_deck.add_card_to_bottom(card)
 
             # Returning the rest of the tickets to the deck and setting gui flag to False
-            self.gui.if_draw_destination_tickets_to_choose = False
+            if self.gui is not None:
+                self.gui.if_draw_destination_tickets_to_choose = False
+            self.mark_dirty("tickets_to_choose", "hand")
             return tickets_for_taking
         
 
@@ -248,7 +391,7 @@ class Game:
         city1 = self.map.cities[city1_index]
         city2 = self.map.cities[city2_index]
 
-        cities_connections = list(dict.fromkeys(city1.get_all_connections_between_cities(city2)))
+        cities_connections = self.map.get_connections_between(city1, city2)
 
         city_conn = None
 
@@ -276,76 +419,91 @@ class Game:
 
         return city_conn
 
-    def claim_conn(self, player: Player, city_conn: CityConnection):
+    def get_payment(self, player: Player, city_conn: CityConnection):
         """
-        Claims a city connection for the player.
-        Returns True if successful, False otherwise - route is taken or player has to few cards.
+        Returns count vector (indexed by TrainCard value) of train cards the player has to spend to claim the connection.
+        Returns None if the connection is claimed or player has to few cards or trains.
+        Does not change the game state.
         """
 
         if city_conn.claimed_by is player:
-            print("You have already claimed this connection.")
-            return False
+            self.log("You have already claimed this connection.")
+            return None
         
         elif city_conn.claimed_by is not None:
-            print("This connection is already claimed by another player.")
-            return False
+            self.log("This connection is already claimed by another player.")
+            return None
+
+        if player.trains < len(city_conn.cost):
+            self.log("Not enough trains to claim this connection.")
+            return None
         
-        conn_cost = Counter(city_conn.cost)
-        player_trains = Counter(player.train_cards)
+        payment = self.payment_planner.best_payment(player.train_cards.counts, city_conn.id)
 
-        # Using Locomotive cards
-        if conn_cost[TrainCard.LOCOMOTIVE] > player_trains[TrainCard.LOCOMOTIVE]:
-            print(f"No enough Locomotive cards to claim this connection.")
-            return False
+        if payment is None:
+            self.log("You don't have enough cards to claim this connection.")
 
-        # Checking all other cards
-        for card, count in conn_cost.items():
+        return payment
 
-            if (
-                player_trains[card] >= count
-            ):  # Paying with base card (non-locomotive for all others colors)
-                player_trains[card] -= count
+    def claimable_connections(self, player: Player):
+        """
+        Returns list of (connection, best payment) pairs of all routes the player can claim now,
+        without changing the game state.
+        The payment is computed once for every route cost signature, most routes share it.
+        """
+
+        compiled = self.map.compiled
+        hand = player.train_cards.counts
+        payments = {}  # Route signature -> payment
+        claimable = []
+
+        for conn in self.map.connections:
+            if conn.claimed_by is not None or compiled.route_lengths[conn.id] > player.trains:
                 continue
 
-            elif (
-                player_trains[TrainCard.LOCOMOTIVE] + player_trains[card] >= count
-                and card != TrainCard.LOCOMOTIVE
-            ):  # Paying with locomotive cards
+            signature = compiled.route_signatures[conn.id]
+            if signature not in payments:
+                payments[signature] = self.payment_planner.best_payment(hand, conn.id)
 
-                non_locomotive_count = player_trains[card]
-                locomotive_count = count - non_locomotive_count
+            payment = payments[signature]
+            if payment is not None:
+                claimable.append((conn, payment))
 
-                player_trains[card] -= non_locomotive_count
-                player_trains[TrainCard.LOCOMOTIVE] -= locomotive_count
+        return claimable
 
-                continue
-            else:
-                print(
-                    f"You don't have enough {card.name} cards to claim this connection."
-                )
-                return False
+    def claim_conn(self, player: Player, city_conn: CityConnection):
+        """
+        Claims a city connection for the player.
+        Returns True if successful, False otherwise - route is taken or player has to few cards.
+        """
 
-        player_trains_diff = Counter(player.train_cards)
+        payment = self.get_payment(player, city_conn)
 
-        #  Getting the count of how many trains should be use for claming connection
-        for card, count in player_trains_diff.items():
-            player_trains_diff[card] -= player_trains[card]
+        if payment is None:
+            return False
 
-        for card, count in player_trains_diff.items():
+        # Spent cards go to the discard pile
+        spent = player.train_cards.spend(payment)
+        self.train_cards_deck.return_cards(spent)
 
-            for _ in range(count):
-                if card in player.train_cards:
-                    player.train_cards.remove(card)  # Spending cards
-                else:
-                    print(f"Card {card.name} not found in player's train cards.")
+        if self.event_log is not None:
+            self.event_log.append(
+                RouteClaimed(self.players.index(player), city_conn.id, tuple(card.value for card in spent))
+            )
+
+        # Open card slots left empty by an exhausted deck get the returned cards
+        if None in self.open_cards_deck.cards:
+            self.open_cards_deck.refill()
+            self.mark_dirty("open_cards")
 
         # Turn summary
         player.trains -= len(city_conn.cost)
         player.score += city_conn.get_score_for_claiming()
         city_conn.claimed_by = player
-        player.cities_connections.append(city_conn)
+        player.add_connection(city_conn)
+        self.mark_dirty("board", "hand")
 
-        print(f"{player.name} claimed the {city_conn}!")
+        self.log(f"{player.name} claimed the {city_conn}!")
         return True
 
     def check_for_accomplished_tickets(self, player: Player):
@@ -361,7 +519,8 @@ class Game:
 
                 player.accomplished_destination_tickets.append(ticket)
                 player.score += ticket.points
-                print(f"{player.name} accomplished a destination ticket: {ticket}")
+                self.mark_dirty("hand")
+                self.log(f"{player.name} accomplished a destination ticket: {ticket}")
 
         # Remove accomplished tickets from the player's list
         player.destination_tickets = [
@@ -373,6 +532,7 @@ class Game:
     def play_turn(self, terminal_mode: bool = False):
         """
         Plays a turn for the current player.
+        Bots (players with a policy) choose their actions without GUI or terminal input.
         """
         player = self.players[self.current_player_index]
         print(f"current player index: {self.current_player_index}")
@@ -382,11 +542,12 @@ class Game:
         move_made = False
         draw_cards = list()
 
-        while not move_made:
-            action = self.gui.get_player_action()
-            time.sleep(1)
-            print(action)
+        # Bots play the whole turn at once
+        if player.policy is not None:
+            self.play_policy_turn(player)
+            move_made = True
 
+        while not move_made:
             if terminal_mode:
                 choice = int(
                     input(
@@ -409,28 +570,43 @@ class Game:
                     case _:
                         print("Invalid choice. Please try again.")
             else:
-                if action == "train_cards_deck":
+                action = self.wait_for_action()
+
+                if action is None:
+                    continue
+
+                print(action)
+
+                if self.quit_requested:
+                    return
+
+                if isinstance(action, DrawTrainCard):
                     # drawing from the deck
                     card = self.train_cards_deck.draw_card()
+                    if card is None:
+                        print("The train cards deck is empty. Please draw an open card.")
+                        continue
+
                     player.train_cards.append(card)
                     draw_cards.append(card)
-                    if len(draw_cards) == 2:
+                    self.mark_dirty("hand", "decks")
+                    if len(draw_cards) == 2 or not self.can_draw_second_card():
                         move_made = True
                     continue
 
-                elif action == "destination_tickets_deck":
+                elif isinstance(action, DrawDestinationTickets):
                     self.draw_destination_tickets(player, 3, 1)
                     move_made = True
                     continue
 
                 # === Handle a click on one of the two parallel-choice rectangles ===
-                if action[1] == "parallel_choice":
-                    idx = action[0]  # 0 or 1
-                    chosen_conn = self.gui.parallel_conns[idx]
+                if isinstance(action, ChooseParallelConnection):
+                    chosen_conn = self.gui.parallel_conns[action.index]
                     print(f"Player chose parallel route: {chosen_conn}")
 
                     # Turn off parallel‐choice mode now that one rectangle was clicked
                     self.gui.parallel_choice_mode = False
+                    self.mark_dirty("all")
 
                     # Attempt to claim the chosen route
                     if self.claim_conn(player, chosen_conn):
@@ -442,15 +618,12 @@ class Game:
                     continue
 
                 # === Handle clicking two cities (might be one or two possible connections) ===
-                elif action[1] == "create_connection":
+                elif isinstance(action, SelectCities):
                     # Extract the two clicked cities
-                    cities = action[0]
-                    city1 = cities.pop()
-                    city2 = cities.pop()
+                    city1 = action.city1
+                    city2 = action.city2
 
-                    cities_connections = list(
-                        dict.fromkeys(city1.get_all_connections_between_cities(city2))
-                    )
+                    cities_connections = self.map.get_connections_between(city1, city2)
 
                     if len(cities_connections) == 0:
                         print("No connection exists between the chosen cities.")
@@ -469,6 +642,7 @@ class Game:
                     elif len(cities_connections) == 2:
                         self.gui.parallel_conns = cities_connections[:]  # store both routes
                         self.gui.parallel_choice_mode = True
+                        self.mark_dirty("all")
                         print(
                             "Two parallel routes detected. Waiting for player to click a rectangle..."
                         )
@@ -482,10 +656,23 @@ class Game:
                             self.check_for_accomplished_tickets(player)
                         continue
 
+                # === Handle clicking directly on a route segment ===
+                elif isinstance(action, ClaimConnection):
+                    conn = action.connection
+                    print(f"Chosen connection: {conn}")
+                    if self.claim_conn(player, conn):
+                        move_made = True
+                        self.check_for_accomplished_tickets(player)
+                    continue
+
                 # === Handle clicking an open‐cards pile index ===
-                elif action[1] == "open_card_index":
-                    index = action[0]
-                    if index < 0 or index >= len(self.open_cards_deck.cards):
+                elif isinstance(action, DrawOpenCard):
+                    index = action.index
+                    if (
+                        index < 0
+                        or index >= len(self.open_cards_deck.cards)
+                        or self.open_cards_deck.cards[index] is None
+                    ):
                         print("Invalid index. Please try again.")
                         continue
                     if (
@@ -499,10 +686,10 @@ class Game:
 
                     card = self.open_cards_deck.draw_card(index)
                     player.train_cards.append(card)
-                    self.open_cards_deck.add_card(self.train_cards_deck.draw_card())
                     draw_cards.append(card)
+                    self.mark_dirty("hand", "open_cards")
 
-                    if len(draw_cards) == 2 or card == TrainCard.LOCOMOTIVE:
+                    if len(draw_cards) == 2 or card == TrainCard.LOCOMOTIVE or not self.can_draw_second_card():
                         move_made = True
                     continue
 
@@ -511,9 +698,292 @@ class Game:
                     continue
 
         # After move_made == True, finish turn
-        time.sleep(1)
         self.turn_number += 1
         self.current_player_index = (self.current_player_index + 1) % len(self.players)
+        self.mark_dirty("hand")
+
+    def start(self, shuffle: bool = True):
+        """
+        Sets up the game for the headless engine (no GUI, no terminal input).
+        Deals initial train cards and draws initial destination tickets for the first player,
+        then the game is driven by legal_actions() and apply().
+        A replayed game starts without shuffling, its decks are in the recorded order.
+        """
+
+        if shuffle:
+            self.train_cards_deck.shuffle()
+
+        if self.event_log is not None:
+            self.event_log.append(
+                GameStarted(
+                    len(self.players),
+                    self.current_player_index,
+                    tuple(card.value for card in self.open_cards_deck.cards),
+                    tuple(card.value for card in self.train_cards_deck.cards),
+                    self.ticket_ids(self.destination_tickets_deck.cards),
+                )
+            )
+
+        for player in self.players:
+            player.train_cards = Hand(self.train_cards_deck.draw_card() for _ in range(4))
+
+        self.setup_players_left = len(self.players)
+        self.offer_destination_tickets(3, 2)
+
+    def offer_destination_tickets(self, num_tickets: int, need_to_take: int):
+        """
+        Draws destination tickets the current player has to choose from.
+        Returns False if the destination tickets deck is empty.
+        """
+
+        tickets = []
+        for _ in range(num_tickets):
+            card = self.destination_tickets_deck.draw_card()
+            if card is None:
+                break
+            tickets.append(card)
+
+        self.destination_tickets_to_choose = tickets
+        self.tickets_need_to_take = min(need_to_take, len(tickets))
+
+        if self.event_log is not None and tickets:
+            self.event_log.append(TicketsDrawn(self.current_player_index, self.ticket_ids(tickets)))
+
+        return len(tickets) > 0
+
+    def legal_actions(self):
+        """
+        Returns the list of actions the current player can make.
+        """
+
+        if self.game_over:
+            return []
+
+        player = self.players[self.current_player_index]
+
+        # Player has to choose from the drawn destination tickets first
+        if self.destination_tickets_to_choose:
+            indices = range(len(self.destination_tickets_to_choose))
+            return [
+                KeepDestinationTickets(chosen)
+                for size in range(self.tickets_need_to_take, len(indices) + 1)
+                for chosen in combinations(indices, size)
+                if chosen
+            ]
+
+        actions = []
+
+        if self.train_cards_deck.can_draw():
+            actions.append(DrawTrainCard())
+
+        for i, card in enumerate(self.open_cards_deck.cards):
+            # Open locomotive cannot be taken as the second card
+            if card is None or (self.cards_drawn_this_turn and card == TrainCard.LOCOMOTIVE):
+                continue
+            actions.append(DrawOpenCard(i))
+
+        if self.cards_drawn_this_turn:
+            return actions
+
+        if self.destination_tickets_deck.cards:
+            actions.append(DrawDestinationTickets())
+
+        for conn, _ in self.claimable_connections(player):
+            actions.append(ClaimConnection(conn))
+
+        return actions
+
+    def apply(self, action):
+        """
+        Applies the action of the current player.
+        Raises ValueError if the action is not allowed at this point of the game.
+        """
+
+        if self.game_over:
+            raise ValueError("The game is over")
+
+        player = self.players[self.current_player_index]
+
+        if not self.perform_action(player, action):
+            return
+
+        # Choosing initial tickets, next player gets the tickets to choose
+        if self.setup_players_left:
+            self.setup_players_left -= 1
+            self.end_turn()
+
+            if self.setup_players_left:
+                self.offer_destination_tickets(3, 2)
+            return
+
+        self.end_turn()
+
+    def perform_action(self, player: Player, action):
+        """
+        Performs the action of the player without passing the turn.
+        Returns True if the player's turn is complete.
+        Raises ValueError if the action is not allowed at this point of the turn.
+        """
+
+        if self.destination_tickets_to_choose and not isinstance(action, KeepDestinationTickets):
+            raise ValueError("Player has to choose destination tickets first")
+
+        match action:
+            case KeepDestinationTickets(indices=indices):
+                self.keep_destination_tickets(player, indices)
+                return True
+
+            case DrawTrainCard():
+                card = self.train_cards_deck.draw_card()
+                if card is None:
+                    raise ValueError("Train cards deck is empty")
+
+                player.train_cards.append(card)
+                self.cards_drawn_this_turn.append(card)
+                self.mark_dirty("hand", "decks")
+
+                if self.event_log is not None:
+                    self.event_log.append(TrainCardDrawn(self.current_player_index, card.value))
+
+                return len(self.cards_drawn_this_turn) == 2 or not self.can_draw_second_card()
+
+            case DrawOpenCard(index=index):
+                cards = self.open_cards_deck.cards
+                if index < 0 or index >= len(cards) or cards[index] is None:
+                    raise ValueError(f"Invalid open card index: {index}")
+
+                if (
+                    self.open_cards_deck.cards[index] == TrainCard.LOCOMOTIVE
+                    and self.cards_drawn_this_turn
+                ):
+                    raise ValueError("Open locomotive cannot be drawn as the second card")
+
+                card = self.open_cards_deck.draw_card(index)
+                player.train_cards.append(card)
+                self.cards_drawn_this_turn.append(card)
+                self.mark_dirty("hand", "open_cards", "decks")
+
+                if self.event_log is not None:
+                    self.event_log.append(OpenCardDrawn(self.current_player_index, index, card.value))
+
+                return (
+                    len(self.cards_drawn_this_turn) == 2
+                    or card == TrainCard.LOCOMOTIVE
+                    or not self.can_draw_second_card()
+                )
+
+            case DrawDestinationTickets():
+                if self.cards_drawn_this_turn:
+                    raise ValueError("Destination tickets cannot be drawn after a train card")
+
+                if not self.offer_destination_tickets(3, 1):
+                    raise ValueError("Destination tickets deck is empty")
+
+                return False
+
+            case ClaimConnection(connection=conn):
+                if self.cards_drawn_this_turn:
+                    raise ValueError("Connection cannot be claimed after drawing a train card")
+
+                if not self.claim_conn(player, conn):
+                    raise ValueError(f"{player.name} cannot claim {conn}")
+
+                self.check_for_accomplished_tickets(player)
+                return True
+
+            case _:
+                raise ValueError(f"Unknown action: {action}")
+
+    def play_policy_turn(self, player: Player):
+        """
+        Plays the turn of a bot, the actions are chosen by the player's policy.
+        """
+
+        while not self.quit_requested:
+            actions = self.legal_actions()
+
+            if not actions:
+                self.log(f"{player.name} cannot make any move.")
+                break
+
+            action = player.policy.choose_action(self, actions)
+            self.log(f"{player.name}: {action}")
+
+            if self.perform_action(player, action):
+                break
+
+        self.cards_drawn_this_turn = []
+
+    def can_draw_second_card(self):
+        """
+        Checks if there is any train card left to draw as the second card of the turn.
+        """
+
+        return self.train_cards_deck.can_draw() or any(
+            card is not None and card != TrainCard.LOCOMOTIVE for card in self.open_cards_deck.cards
+        )
+
+    def keep_destination_tickets(self, player: Player, indices: tuple[int, ...]):
+        """
+        Gives the chosen destination tickets to the player, the rest goes to the bottom of the deck.
+        """
+
+        tickets = self.destination_tickets_to_choose
+
+        if len(set(indices)) != len(indices) or any(i < 0 or i >= len(tickets) for i in indices):
+            raise ValueError(f"Invalid destination tickets indices: {indices}")
+
+        if len(indices) < max(self.tickets_need_to_take, 1):
+            raise ValueError(f"Player has to take at least {self.tickets_need_to_take} tickets")
+
+        player.destination_tickets.extend(tickets[i] for i in indices)
+
+        for i, ticket in enumerate(tickets):
+            if i not in indices:
+                self.destination_tickets_deck.add_card_to_bottom(ticket)
+
+        self.destination_tickets_to_choose = []
+        self.tickets_need_to_take = 0
+        self.mark_dirty("tickets_to_choose", "hand")
+
+        if self.event_log is not None:
+            self.event_log.append(TicketsKept(self.players.index(player), tuple(indices)))
+
+    def end_turn(self):
+        """
+        Passes the turn to the next player, handles the last round and the end of the game.
+        Players without any legal action are skipped.
+        """
+
+        self.cards_drawn_this_turn = []
+        self.turn_number += 1
+
+        if self.last_round_turns_left is not None:
+            self.last_round_turns_left -= 1
+
+            if self.last_round_turns_left <= 0:
+                self.game_over = True
+                self.finish_game()
+                return
+
+        elif not self.setup_players_left and self.if_start_last_round():
+            self.last_round_turns_left = len(self.players)
+
+        self.current_player_index = (self.current_player_index + 1) % len(self.players)
+
+        if self.setup_players_left:
+            return
+
+        for _ in range(len(self.players)):
+            if self.legal_actions():
+                return
+
+            self.log(f"{self.players[self.current_player_index].name} cannot make any move.")
+            self.current_player_index = (self.current_player_index + 1) % len(self.players)
+
+        # Nobody can move
+        self.game_over = True
+        self.finish_game()
 
     def if_start_last_round(self):
         """
@@ -528,13 +998,20 @@ class Game:
 
 
 def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Plays the game in a window.")
+    parser.add_argument(
+        "--dirty-redraw", action="store_true", help="Redraw only the screen regions that changed"
+    )
+    args = parser.parse_args()
 
     train_cards_deck = TrainCardsDeck()
     open_cards_deck = OpenCardsDeck(train_cards_deck)
 
     game = Game(
         map=Map(),
-        train_cards_deck=TrainCardsDeck(),
+        train_cards_deck=train_cards_deck,
         open_cards_deck=open_cards_deck,
         destination_tickets_deck=DestinationTicketsDeck(),
         current_player_index=0,
@@ -552,10 +1029,15 @@ def main():
     print("\nGame created successfully!")
     print(game)
 
-    # Initialize GUI
+    # Initialize GUI, pygame is imported only when a window is created
+    from gui import GUI
+
+    gui_ready = Event()
+
     def run_gui():
-        gui = GUI(game)
+        gui = GUI(game, dirty_redraw=args.dirty_redraw)
         game.gui = gui
+        gui_ready.set()
         gui.run()
 
     def run_game():
@@ -576,8 +1058,8 @@ def main():
     #     + [TrainCard.GREEN] * 4
     #     + [TrainCard.PINK] * 4
     # )
-    # Run the game logic in the main thread
-    time.sleep(1)
+    # Run the game logic in the main thread once the GUI exists
+    gui_ready.wait()
     run_game()
 
 if __name__ == "__main__":
@@ -0,0 +1,467 @@
+from random import Random
+
+from cards import CARD_VECTOR_SIZE, TrainCard
+from compiled_map import CompiledMap
+from game import LONGEST_ROUTE_BONUS
+from longest_route import LongestRouteSolver
+from payment import PaymentPlanner
+
+LOCOMOTIVE = TrainCard.LOCOMOTIVE.value
+EMPTY_SLOT = 0  # Open card slot left empty by an exhausted train cards deck, card values start at 1
+
+# Moves are tuples, the first item is the kind
+CLAIM = 0  # (CLAIM, route id, payment count vector)
+DRAW_DECK = 1  # (DRAW_DECK,)
+DRAW_OPEN = 2  # (DRAW_OPEN, open card index)
+PASS = 3  # (PASS,) - the player has no other move
+
+
+class GameState:
+    """
+    Compact copy of the game for search-based bots.
+    Everything is stored in lists of ints indexed by player, route or city id (see CompiledMap),
+    so a move is applied and undone in place without copying the game:
+
+        state.apply(move)
+        ...
+        state.undo()
+
+    Every applied move pushes an undo record to 'history'.
+    Drawing destination tickets is not part of the search, tickets held by players are scored when completed.
+    """
+
+    def __init__(self, compiled: CompiledMap, num_players: int, rng: Random = None):
+        self.compiled = compiled
+        self.payment_planner = PaymentPlanner(compiled)
+        self.num_players = num_players
+        self.rng = rng or Random()  # Shuffles the discard pile into the draw pile
+
+        self.route_owner = [-1] * compiled.num_routes  # Route id -> player index, -1 if not claimed
+        self.hands = [[0] * CARD_VECTOR_SIZE for _ in range(num_players)]  # Count vectors
+        self.trains = [45] * num_players
+        self.scores = [0] * num_players
+
+        self.train_deck = []  # Card values, the top is at the end
+        self.discard_pile = []
+        self.open_cards = []
+
+        self.tickets = []  # Ticket id -> (start city id, end city id, points)
+        self.open_tickets = [[] for _ in range(num_players)]  # Ticket ids not completed yet
+        self.completed_tickets = [[] for _ in range(num_players)]
+
+        # Cities connected by routes of every player: union-find without path compression, so unions can be undone
+        self.parents = [list(range(compiled.num_cities)) for _ in range(num_players)]
+        self.sizes = [[1] * compiled.num_cities for _ in range(num_players)]
+
+        self.current_player = 0
+        self.cards_drawn = 0  # Train cards drawn in the current turn
+        self.last_round_turns_left = None
+        self.passes = 0  # Turns passed in a row, the game ends when nobody can move
+        self.turn_number = 0
+        self.game_over = False
+
+        self.history = []
+
+    @classmethod
+    def from_game(cls, game: "Game", rng: Random = None):
+        """
+        Creates the state of the headless game (see Game.start / Game.apply).
+        Raises ValueError if a player has to choose destination tickets first.
+        """
+
+        if game.destination_tickets_to_choose:
+            raise ValueError("Destination tickets have to be chosen first")
+
+        compiled = game.map.compiled
+        state = cls(compiled, len(game.players), rng or Random(game.rng.random()))
+        player_ids = {id(player): i for i, player in enumerate(game.players)}
+
+        for i, player in enumerate(game.players):
+            state.hands[i] = list(player.train_cards.counts)
+            state.trains[i] = player.trains
+            state.scores[i] = player.score
+
+            for ticket in player.destination_tickets:
+                state.open_tickets[i].append(len(state.tickets))
+                state.tickets.append(
+                    (compiled.city_ids[ticket.start_city], compiled.city_ids[ticket.end_city], ticket.points)
+                )
+
+            for ticket in player.accomplished_destination_tickets:
+                state.completed_tickets[i].append(len(state.tickets))
+                state.tickets.append(
+                    (compiled.city_ids[ticket.start_city], compiled.city_ids[ticket.end_city], ticket.points)
+                )
+
+        for conn in game.map.connections:
+            if conn.claimed_by is not None:
+                owner = player_ids[id(conn.claimed_by)]
+                state.route_owner[conn.id] = owner
+                state.union(owner, *compiled.route_cities(conn.id))
+
+        state.train_deck = [card.value for card in game.train_cards_deck.cards]
+        state.discard_pile = [card.value for card in game.train_cards_deck.discard_pile]
+        state.open_cards = [EMPTY_SLOT if card is None else card.value for card in game.open_cards_deck.cards]
+
+        state.current_player = game.current_player_index
+        state.cards_drawn = len(game.cards_drawn_this_turn)
+        state.last_round_turns_left = game.last_round_turns_left
+        state.turn_number = game.turn_number
+        state.game_over = game.game_over
+
+        return state
+
+    def copy(self):
+        """
+        Returns an independent copy of the state (without the undo history).
+        """
+
+        state = GameState.__new__(GameState)
+        state.__dict__.update(self.__dict__)
+
+        state.rng = Random()
+        state.rng.setstate(self.rng.getstate())
+        state.route_owner = self.route_owner[:]
+        state.hands = [hand[:] for hand in self.hands]
+        state.trains = self.trains[:]
+        state.scores = self.scores[:]
+        state.train_deck = self.train_deck[:]
+        state.discard_pile = self.discard_pile[:]
+        state.open_cards = self.open_cards[:]
+        state.open_tickets = [tickets[:] for tickets in self.open_tickets]
+        state.completed_tickets = [tickets[:] for tickets in self.completed_tickets]
+        state.parents = [parents[:] for parents in self.parents]
+        state.sizes = [sizes[:] for sizes in self.sizes]
+        state.history = []
+
+        return state
+
+    def find(self, player: int, city: int):
+        parents = self.parents[player]
+        while parents[city] != city:
+            city = parents[city]
+        return city
+
+    def union(self, player: int, city1: int, city2: int):
+        """
+        Joins the cities in the network of the player.
+        Returns the root attached to the other one (for undo), None if they were connected already.
+        """
+
+        root1 = self.find(player, city1)
+        root2 = self.find(player, city2)
+
+        if root1 == root2:
+            return None
+
+        sizes = self.sizes[player]
+        if sizes[root1] < sizes[root2]:
+            root1, root2 = root2, root1
+
+        self.parents[player][root2] = root1
+        sizes[root1] += sizes[root2]
+
+        return root2
+
+    def can_draw_card(self):
+        return bool(self.train_deck or self.discard_pile)
+
+    def legal_moves(self):
+        """
+        Returns list of moves of the current player.
+        """
+
+        if self.game_over:
+            return []
+
+        player = self.current_player
+        moves = []
+
+        if self.can_draw_card():
+            moves.append((DRAW_DECK,))
+
+        for i, card in enumerate(self.open_cards):
+            # Open locomotive cannot be taken as the second card
+            if card != EMPTY_SLOT and not (self.cards_drawn and card == LOCOMOTIVE):
+                moves.append((DRAW_OPEN, i))
+
+        if not self.cards_drawn:
+            hand = self.hands[player]
+            payments = {}  # Route signature -> payment
+            signatures = self.compiled.route_signatures
+            lengths = self.compiled.route_lengths
+
+            for route_id, owner in enumerate(self.route_owner):
+                if owner != -1 or lengths[route_id] > self.trains[player]:
+                    continue
+
+                signature = signatures[route_id]
+                if signature not in payments:
+                    payments[signature] = self.payment_planner.best_payment(hand, route_id)
+
+                if payments[signature] is not None:
+                    moves.append((CLAIM, route_id, payments[signature]))
+
+        if not moves:
+            moves.append((PASS,))
+
+        return moves
+
+    def apply(self, move: tuple):
+        """
+        Applies the move of the current player, the move has to be legal.
+        """
+
+        # Turn state before the move, restored by undo
+        record = [
+            move,
+            (self.current_player, self.cards_drawn, self.last_round_turns_left, self.passes, self.turn_number, self.game_over),
+        ]
+        player = self.current_player
+
+        if move[0] == CLAIM:
+            _, route_id, payment = move
+            hand = self.hands[player]
+            for value, count in enumerate(payment):
+                hand[value] -= count
+                self.discard_pile.extend([value] * count)
+
+            self.route_owner[route_id] = player
+            self.trains[player] -= self.compiled.route_lengths[route_id]
+            self.scores[player] += self.compiled.route_points[route_id]
+            attached = self.union(player, *self.compiled.route_cities(route_id))
+
+            # Tickets completed by this route, only possible if it joined two components
+            open_tickets = self.open_tickets[player]
+            completed = []
+            if attached is not None:
+                completed = [
+                    ticket
+                    for ticket in open_tickets
+                    if self.find(player, self.tickets[ticket][0]) == self.find(player, self.tickets[ticket][1])
+                ]
+
+            if completed:
+                self.open_tickets[player] = [ticket for ticket in open_tickets if ticket not in completed]
+                for ticket in completed:
+                    self.completed_tickets[player].append(ticket)
+                    self.scores[player] += self.tickets[ticket][2]
+
+            record.append((attached, completed, open_tickets, self.refill_open_cards()))
+            self.passes = 0
+            self.end_turn()
+
+        elif move[0] == DRAW_DECK:
+            reshuffle = self.refill_train_deck()
+            card = self.train_deck.pop()
+            self.hands[player][card] += 1
+
+            record.append((card, reshuffle))
+            self.after_card_drawn(card_is_open_locomotive=False)
+
+        elif move[0] == DRAW_OPEN:
+            index = move[1]
+            card = self.open_cards[index]
+            self.hands[player][card] += 1
+
+            reshuffle = self.refill_train_deck()
+            if self.train_deck:
+                self.open_cards[index] = self.train_deck.pop()
+                refilled = True
+            else:
+                self.open_cards[index] = EMPTY_SLOT
+                refilled = False
+
+            record.append((card, refilled, reshuffle))
+            self.after_card_drawn(card_is_open_locomotive=card == LOCOMOTIVE)
+
+        elif move[0] == PASS:
+            self.passes += 1
+            self.end_turn()
+
+            if self.passes >= self.num_players:
+                self.game_over = True
+
+        self.history.append(record)
+
+    def undo(self):
+        """
+        Reverts the last applied move.
+        """
+
+        move, turn, *details = self.history.pop()
+        player = turn[0]
+
+        if move[0] == CLAIM:
+            _, route_id, payment = move
+            attached, completed, open_tickets, open_refill = details[0]
+
+            # Undone first, the reshuffle record holds the discard pile with the payment
+            self.undo_refill_open_cards(open_refill)
+
+            if completed:
+                self.open_tickets[player] = open_tickets
+                for ticket in completed:
+                    self.completed_tickets[player].pop()
+                    self.scores[player] -= self.tickets[ticket][2]
+
+            if attached is not None:
+                parents = self.parents[player]
+                root = parents[attached]
+                parents[attached] = attached
+                self.sizes[player][root] -= self.sizes[player][attached]
+
+            self.scores[player] -= self.compiled.route_points[route_id]
+            self.trains[player] += self.compiled.route_lengths[route_id]
+            self.route_owner[route_id] = -1
+
+            hand = self.hands[player]
+            for value, count in enumerate(payment):
+                if count:
+                    hand[value] += count
+                    del self.discard_pile[-count:]
+
+        elif move[0] == DRAW_DECK:
+            card, reshuffle = details[0]
+            self.hands[player][card] -= 1
+            self.train_deck.append(card)
+            self.undo_refill(reshuffle)
+
+        elif move[0] == DRAW_OPEN:
+            index = move[1]
+            card, refilled, reshuffle = details[0]
+
+            if refilled:
+                self.train_deck.append(self.open_cards[index])
+            self.open_cards[index] = card
+
+            self.hands[player][card] -= 1
+            self.undo_refill(reshuffle)
+
+        (
+            self.current_player,
+            self.cards_drawn,
+            self.last_round_turns_left,
+            self.passes,
+            self.turn_number,
+            self.game_over,
+        ) = turn
+
+    def refill_train_deck(self):
+        """
+        Shuffles the discard pile into the empty draw pile.
+        Returns undo information: None if nothing changed, otherwise (discard pile, random generator state).
+        """
+
+        if self.train_deck or not self.discard_pile:
+            return None
+
+        reshuffle = (self.discard_pile, self.rng.getstate())
+
+        self.train_deck = self.discard_pile[:]
+        self.rng.shuffle(self.train_deck)
+        self.discard_pile = []
+
+        return reshuffle
+
+    def undo_refill(self, reshuffle):
+        if reshuffle is None:
+            return
+
+        self.discard_pile, rng_state = reshuffle
+        self.rng.setstate(rng_state)
+        self.train_deck = []
+
+    def refill_open_cards(self):
+        """
+        Fills the empty open card slots after cards were returned to the discard pile.
+        Returns undo information: None if nothing changed, otherwise (refilled slot indices, reshuffle).
+        """
+
+        if EMPTY_SLOT not in self.open_cards:
+            return None
+
+        reshuffle = self.refill_train_deck()
+        refilled = []
+
+        for i, card in enumerate(self.open_cards):
+            if card == EMPTY_SLOT and self.train_deck:
+                self.open_cards[i] = self.train_deck.pop()
+                refilled.append(i)
+
+        return refilled, reshuffle
+
+    def undo_refill_open_cards(self, open_refill):
+        if open_refill is None:
+            return
+
+        refilled, reshuffle = open_refill
+        for i in reversed(refilled):
+            self.train_deck.append(self.open_cards[i])
+            self.open_cards[i] = EMPTY_SLOT
+
+        self.undo_refill(reshuffle)
+
+    def after_card_drawn(self, card_is_open_locomotive: bool):
+        """
+        Ends the turn after the second card, an open locomotive or if there is nothing to draw.
+        """
+
+        self.cards_drawn += 1
+        self.passes = 0
+
+        can_draw_second = self.can_draw_card() or any(
+            card not in (LOCOMOTIVE, EMPTY_SLOT) for card in self.open_cards
+        )
+
+        if self.cards_drawn == 2 or card_is_open_locomotive or not can_draw_second:
+            self.end_turn()
+
+    def end_turn(self):
+        """
+        Passes the turn to the next player and handles the last round.
+        """
+
+        self.cards_drawn = 0
+        self.turn_number += 1
+
+        if self.last_round_turns_left is not None:
+            self.last_round_turns_left -= 1
+
+            if self.last_round_turns_left <= 0:
+                self.game_over = True
+                return
+
+        elif min(self.trains) <= 2:
+            self.last_round_turns_left = self.num_players
+
+        self.current_player = (self.current_player + 1) % self.num_players
+
+    def longest_routes(self):
+        """
+        Returns the length of the longest continuous route of every player.
+        """
+
+        solvers = [LongestRouteSolver() for _ in range(self.num_players)]
+
+        for route_id, owner in enumerate(self.route_owner):
+            if owner != -1:
+                solvers[owner].add_edge(*self.compiled.route_cities(route_id), self.compiled.route_lengths[route_id])
+
+        return [solver.longest() for solver in solvers]
+
+    def final_scores(self):
+        """
+        Returns scores with the longest route bonus added, as Game.finish_game does.
+        """
+
+        scores = self.scores[:]
+        longest_routes = self.longest_routes()
+        longest = max(longest_routes)
+
+        if longest:
+            for player, length in enumerate(longest_routes):
+                if length == longest:
+                    scores[player] += LONGEST_ROUTE_BONUS
+
+        return scores
@@ -0,0 +1,119 @@
+import math
+
+from map import CityConnection
+
+
+class RouteGeometry:
+    """
+    Precomputed screen polygons of all routes.
+    Built once per map and screen size and shared by route drawing, train drawing and hit-testing.
+    """
+
+    # Pixel sizes of the route layout
+    segment_width = 10
+    car_width = 8
+    car_inset = 0.2  # Train car is 20% smaller than the route segment
+    gap = 4
+    offset = 15  # Padding left around the city circle
+    parallel_distance = 25
+
+    def __init__(self, route_shifts: list[tuple[CityConnection, float]], scale_coordinates):
+        """
+        'route_shifts' - list of (connection, parallel shift) pairs
+        'scale_coordinates' - function mapping map coordinates to screen coordinates
+        """
+
+        # Keyed by route id (CityConnection.id), identical parallel connections compare equal
+        self.segments = {}  # Route id -> list of segment polygons
+        self.cars = {}  # Route id -> list of train car polygons
+        self.bounds = {}  # Route id -> (min_x, min_y, max_x, max_y) of its segments
+
+        for conn, shift in route_shifts:
+            self.add_connection(conn, shift, scale_coordinates)
+
+    def add_connection(self, conn: CityConnection, parallel_shift: float, scale_coordinates):
+        """
+        Computes segment and car polygons of one connection.
+        """
+
+        segments = []
+        cars = []
+        self.segments[conn.id] = segments
+        self.cars[conn.id] = cars
+
+        a, b = list(conn.cities)
+        x1, y1 = scale_coordinates(*a.point)
+        x2, y2 = scale_coordinates(*b.point)
+        dx, dy = x2 - x1, y2 - y1
+        dist = math.hypot(dx, dy)
+        n = len(conn.cost)
+
+        if dist == 0 or n == 0:
+            return
+
+        # Unit direction and its perpendicular
+        dx, dy = dx / dist, dy / dist
+        px, py = -dy, dx
+
+        # Shift double-route to its side, direction stays the same
+        shift = parallel_shift * self.parallel_distance
+        x1, y1 = x1 + px * shift, y1 + py * shift
+
+        seg_len = (dist - 2 * self.offset - self.gap * (n - 1)) / n
+        sx, sy = x1 + dx * self.offset, y1 + dy * self.offset
+
+        # Half-extents along the route and across it
+        half_len_x, half_len_y = dx * seg_len / 2, dy * seg_len / 2
+        half_seg_x, half_seg_y = px * self.segment_width / 2, py * self.segment_width / 2
+
+        car_scale = 1 - self.car_inset
+        car_len_x, car_len_y = half_len_x * car_scale, half_len_y * car_scale
+        half_car_x = px * self.car_width / 2 * car_scale
+        half_car_y = py * self.car_width / 2 * car_scale
+
+        for i in range(n):
+            cx = sx + dx * (i * (seg_len + self.gap) + seg_len / 2)
+            cy = sy + dy * (i * (seg_len + self.gap) + seg_len / 2)
+
+            segments.append(
+                (
+                    (cx - half_len_x + half_seg_x, cy - half_len_y + half_seg_y),
+                    (cx - half_len_x - half_seg_x, cy - half_len_y - half_seg_y),
+                    (cx + half_len_x - half_seg_x, cy + half_len_y - half_seg_y),
+                    (cx + half_len_x + half_seg_x, cy + half_len_y + half_seg_y),
+                )
+            )
+            cars.append(
+                (
+                    (cx - car_len_x + half_car_x, cy - car_len_y + half_car_y),
+                    (cx - car_len_x - half_car_x, cy - car_len_y - half_car_y),
+                    (cx + car_len_x - half_car_x, cy + car_len_y - half_car_y),
+                    (cx + car_len_x + half_car_x, cy + car_len_y + half_car_y),
+                )
+            )
+
+        xs = [x for segment in segments for x, _ in segment]
+        ys = [y for segment in segments for _, y in segment]
+        self.bounds[conn.id] = (min(xs), min(ys), max(xs), max(ys))
+
+
+def is_point_in_polygon(point: tuple[float, float], polygon) -> bool:
+    """
+    Checks if the point lies inside the convex polygon.
+    """
+
+    x, y = point
+    sign = 0
+
+    for i in range(len(polygon)):
+        x1, y1 = polygon[i]
+        x2, y2 = polygon[(i + 1) % len(polygon)]
+        cross = (x2 - x1) * (y - y1) - (y2 - y1) * (x - x1)
+
+        if cross != 0:
+            if sign == 0:
+                sign = 1 if cross > 0 else -1
+            elif (cross > 0) != (sign > 0):
+                return False
+
+    return True
@@ -1,10 +1,80 @@
 import pygame
-import math
+import time
+from collections import defaultdict
+from contextlib import contextmanager
 from pathlib import Path
+from queue import Queue
+from threading import Lock
 import os
 
+from actions import (
+    ChooseDestinationTicket,
+    ChooseParallelConnection,
+    ClaimConnection,
+    DrawDestinationTickets,
+    DrawOpenCard,
+    DrawTrainCard,
+    QuitGame,
+    SelectCities,
+    Skip,
+)
 from map import CityConnection
+from geometry import RouteGeometry
+from spatial import SpatialIndex
 from cards import DestinationTicketCard
+from ticket_estimator import TicketEstimator
+
+
+# Posted to wake up the GUI loop in dirty redraw mode
+REDRAW_EVENT = pygame.event.custom_type()
+
+
+class RenderTimer:
+    """
+    Collects render times of the drawn layers, so frame cost can be measured.
+    """
+
+    def __init__(self):
+        self.total_times = defaultdict(float)
+        self.counts = defaultdict(int)
+        self.last_times = {}
+
+    @contextmanager
+    def measure(self, layer: str):
+        """
+        Measures time spent inside the with-block and adds it to the given layer.
+        """
+
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            self.total_times[layer] += elapsed
+            self.counts[layer] += 1
+            self.last_times[layer] = elapsed
+
+    def average_ms(self, layer: str):
+        """
+        Returns the average render time of the layer in milliseconds.
+        """
+
+        if self.counts[layer] == 0:
+            return 0.0
+
+        return self.total_times[layer] / self.counts[layer] * 1000
+
+    def reset(self):
+        self.total_times.clear()
+        self.counts.clear()
+        self.last_times.clear()
+
+    def __str__(self):
+        layers_str = ", ".join(
+            f"{layer}: {self.average_ms(layer):.3f} ms (last {self.last_times[layer] * 1000:.3f} ms)"
+            for layer in self.counts
+        )
+        return f"RenderTimer: [{layers_str}]"
 
 
 class GUI:
@@ -12,10 +82,12 @@ class GUI:
         self,
         game,
         cards_folder_path=os.path.join(os.path.dirname(__file__), "../cards_graphics"),
+        dirty_redraw: bool = False,
     ):
         self.game = game
         # Use the RESIZABLE flag to allow window resizing
         # self.screen = pygame.display.set_mode((1600, 800), pygame.RESIZABLE)
+        self.fullscreen = True
         self.screen = pygame.display.set_mode((0, 0), pygame.FULLSCREEN)
         pygame.display.set_caption("Ticket to Ride")
         pygame.font.init()  # Initialize the font module
@@ -30,8 +102,39 @@ class GUI:
 
         self.if_draw_destination_tickets_to_choose = False
 
+        # Routes the current player can pay for are outlined
+        self.highlight_claimable = True
+        self.highlight_color = (255, 215, 0)
+        self.highlight_width = 3
+        self.claimable_routes = frozenset()  # Route ids, recomputed when claimable_key changes
+        self.claimable_key = None
+        self.drawn_claimable_routes = frozenset()  # Route ids outlined on the screen in dirty redraw mode
+
+        # Completion probability shown under the destination tickets to choose
+        self.show_ticket_estimates = True
+        self.ticket_estimator = None
+        self.ticket_estimates = None
+        self.ticket_estimates_key = None
+
         self.clock = pygame.time.Clock()
 
+        # Render timings; printed every 'timings_report_interval' frames (0 disables)
+        self.render_timer = RenderTimer()
+        self.timings_report_interval = 0
+        self.frame_count = 0
+
+        # Dirty redraw mode: frame is drawn only when some region was marked
+        # as changed and only these regions are updated on the display
+        self.dirty_redraw = dirty_redraw
+        self.dirty_regions = {"all"}
+        self.dirty_lock = Lock()
+        self.closed = False  # Set under dirty_lock before pygame.quit(), no redraw events are posted after it
+        self.idle_timeout = 500  # Milliseconds to wait for an event before checking again
+
+        # Player actions made in the GUI thread, consumed by the game logic thread
+        self.actions = Queue()
+        self.clicked_cities = []
+
         self.cards_folder_path = cards_folder_path
         self.city_radius = 7  # Radius for city circles
 
@@ -62,21 +165,162 @@ class GUI:
             for i, player in enumerate(self.game.players)
         }
 
-        # Load map data from YAML file
         script_dir = Path(__file__).resolve().parent
-        yaml_path = (
-            script_dir / "../config/set_europe_close_up/europe_map_close_up.yaml"
-        )
 
-    def draw(self):
-        # 1) Tło
-        script_dir = Path(__file__).resolve().parent
-        map_path = script_dir / "../config/set_europe_close_up/Europe_Map.jpg"
-        bg_img = pygame.image.load(map_path)
-        scaled_bg = pygame.transform.scale(bg_img, self.screen.get_size())
-        self.screen.blit(scaled_bg, (0, 0))
+        # Background image is decoded once and scaled once per screen size
+        self.map_image_path = script_dir / "../config/set_europe_close_up/Europe_Map.jpg"
+        self.background_image = None
+        self.background_cache = {}
+
+        # Static layer: background, routes and city labels
+        self.board_surface = None
+
+        # Fonts, card images and ticket images reused between frames
+        self.fonts = {}
+        self.card_images = {}
+        self.ticket_images = {}
+
+        # Routes grouped once, parallel routes get opposite shifts
+        self.route_shifts = self.get_route_shifts()
+        self.route_geometry = None
+        self.route_geometry_size = None
+
+        # Clickable zones, rebuilt when the layout changes
+        self.hit_index = None
+        self.hit_index_key = None
+
+    def get_background(self):
+        """
+        Returns the map background scaled to the current screen size.
+        Image is decoded only once, scaled surface is cached by the screen size.
+        """
+
+        size = self.screen.get_size()
+        background = self.background_cache.get(size)
+
+        if background is None:
+            if self.background_image is None:
+                self.background_image = pygame.image.load(self.map_image_path).convert()
+
+            background = pygame.transform.scale(self.background_image, size).convert()
+
+            # Only the surface for the current size is kept
+            self.background_cache = {size: background}
+
+        return background
+
+    def get_board_surface(self):
+        """
+        Returns the static board layer: background with all routes, city circles and city names drawn on it.
+        Layer is rebuilt only when the screen size changes.
+        """
+
+        size = self.screen.get_size()
+
+        if self.board_surface is None or self.board_surface.get_size() != size:
+            board = self.get_background().copy()
+            self.draw_routes(board)
+            self.draw_cities(board)
+            self.board_surface = board
+
+        return self.board_surface
+
+    def get_font(self, size: int):
+        """
+        Returns the default font of the given size, fonts are created only once.
+        """
+
+        font = self.fonts.get(size)
+
+        if font is None:
+            font = pygame.font.Font(None, size)
+            self.fonts[size] = font
+
+        return font
+
+    def get_card_image(self, file_name: str, size: tuple[int, int]):
+        """
+        Returns the card image from the cards folder scaled to the given size.
+        Raises pygame.error if the image cannot be loaded.
+        """
+
+        key = (file_name, size)
+        image = self.card_images.get(key)
+
+        if image is None:
+            image_path = os.path.join(self.cards_folder_path, file_name)
+            image = pygame.transform.scale(pygame.image.load(image_path), size).convert()
+            self.card_images[key] = image
+
+        return image
+
+    def get_ticket_image(self, ticket: DestinationTicketCard, size: tuple[int, int]):
+        """
+        Returns the rendered destination ticket scaled to the given size.
+        """
+
+        player = self.game.players[self.game.current_player_index]
+        accomplished = ticket in player.accomplished_destination_tickets
+
+        key = (ticket, size, accomplished)
+        image = self.ticket_images.get(key)
+
+        if image is None:
+            image = pygame.transform.scale(self.create_image_from_ticket(ticket), size)
+            self.ticket_images[key] = image
 
+        return image
+
+    def invalidate_render_cache(self):
+        """
+        Drops all cached surfaces, e.g. after the window was resized.
+        """
+
+        self.background_cache.clear()
+        self.board_surface = None
+        self.route_geometry = None
+        self.hit_index = None
+        self.card_images.clear()
+        self.ticket_images.clear()
+
+    def toggle_fullscreen(self):
+        """
+        Switches between fullscreen and resizable window mode.
+        """
+
+        self.fullscreen = not self.fullscreen
+
+        if self.fullscreen:
+            self.screen = pygame.display.set_mode((0, 0), pygame.FULLSCREEN)
+        else:
+            self.screen = pygame.display.set_mode((1600, 800), pygame.RESIZABLE)
+
+        self.invalidate_render_cache()
+
+    def handle_window_event(self, event):
+        """
+        Handles window resizing and fullscreen toggling (F11).
+        Returns True if the event was consumed.
+        """
+
+        if event.type == pygame.VIDEORESIZE:
+            self.invalidate_render_cache()
+            self.mark_dirty("all")
+            return True
+
+        if event.type == pygame.KEYDOWN and event.key == pygame.K_F11:
+            self.toggle_fullscreen()
+            self.mark_dirty("all")
+            return True
+
+        return False
+
+    def draw(self):
         if self.parallel_choice_mode:
+            # 1) Tło
+            with self.render_timer.measure("background"):
+                self.screen.blit(self.get_background(), (0, 0))
+
             current_w, current_h = self.screen.get_size()
 
             rect_w = int(current_w * 0.4)
@@ -104,7 +348,7 @@ class GUI:
             pygame.draw.rect(self.screen, (0, 0, 0), self.parallel_rects[0], 3)
             pygame.draw.rect(self.screen, (0, 0, 0), self.parallel_rects[1], 3)
 
-            font = pygame.font.Font(None, 28)
+            font = self.get_font(28)
 
             cityA0, cityB0 = list(conn0.cities)
             cityA1, cityB1 = list(conn1.cities)
@@ -121,16 +365,38 @@ class GUI:
             text1_rect = surf1.get_rect(center=rect1_center)
             self.screen.blit(surf0, text0_rect)
             self.screen.blit(surf1, text1_rect)
-
-            pygame.display.flip()
             return
 
-        self.draw_routes()
+        # Static board: background, routes and city labels
+        with self.render_timer.measure("board"):
+            self.screen.blit(self.get_board_surface(), (0, 0))
+
+        with self.render_timer.measure("trains"):
+            self.draw_claimed_trains()
+
+        if self.highlight_claimable:
+            with self.render_timer.measure("highlights"):
+                self.draw_claimable_routes()
+
+        with self.render_timer.measure("cards"):
+            self.draw_player_cards()
+            self.draw_player_tickets()
+            self.draw_open_cards()
+            self.draw_trains_deck()
+            self.draw_destination_cards()
+
+            if self.if_draw_destination_tickets_to_choose:
+                self.draw_destination_tickets_to_choose()
+
+    def draw_cities(self, surface):
+        """
+        Draws city circles and names with white contour on the given surface.
+        """
 
-        font = pygame.font.Font(None, 24)
+        font = self.get_font(24)
         for city in self.cities:
             x, y = self.scale_coordinates(*city.point)
-            pygame.draw.circle(self.screen, (0, 0, 0), (x, y), self.city_radius)
+            pygame.draw.circle(surface, (0, 0, 0), (x, y), self.city_radius)
 
             text_surf = font.render(city.name, True, (0, 0, 0))
             outline_surf = font.render(city.name, True, (255, 255, 255))
@@ -141,201 +407,134 @@ class GUI:
                     if dx == 0 and dy == 0:
                         continue
                     pos = outline_surf.get_rect(center=(x + dx + 10, y + dy - 10))
-                    self.screen.blit(outline_surf, pos)
+                    surface.blit(outline_surf, pos)
 
             # black interior
             pos = text_surf.get_rect(center=(x + 10, y - 10))
-            self.screen.blit(text_surf, pos)
+            surface.blit(text_surf, pos)
 
-        self.draw_player_cards()
-        self.draw_player_tickets()
-        self.draw_open_cards()
-        self.draw_trains_deck()
-        self.draw_destination_cards()
-
-        if self.if_draw_destination_tickets_to_choose:
-            self.draw_destination_tickets_to_choose()
+    def draw_player_trains(self, conn: CityConnection, surface=None):
+        """Draw small train‐car rectangles on *this* route, with the same shift."""
+        if surface is None:
+            surface = self.screen
 
-        pygame.display.flip()
+        player_color = self.player_colors.get(conn.claimed_by, (0, 0, 0))
 
-    def draw_player_trains(self, conn: CityConnection, parallel_shift=0):
-        """Draw small train‐car rectangles on *this* route, with the same shift."""
-        # endpoints
-        a, b = conn.cities
-        x1, y1 = self.scale_coordinates(*a.point)
-        x2, y2 = self.scale_coordinates(*b.point)
-        dx, dy = x2 - x1, y2 - y1
-        dist = math.hypot(dx, dy)
-        if dist == 0:
-            return
+        for car in self.get_route_geometry().cars[conn.id]:
+            pygame.draw.polygon(surface, player_color, car)
+            pygame.draw.polygon(surface, (255, 255, 255), car, 2)
 
-        # normalize
-        dx /= dist
-        dy /= dist
-        # perpendicular
-        px, py = -dy, dx
-
-        # apply the same parallel shift that draw_route used
-        if parallel_shift != 0:
-            x1 += px * parallel_shift * 25
-            y1 += py * parallel_shift * 25
-            x2 += px * parallel_shift * 25
-            y2 += py * parallel_shift * 25
-            dx = x2 - x1
-            dy = y2 - y1
-            dist = math.hypot(dx, dy)
-            dx /= dist
-            dy /= dist
-            px, py = -dy, dx
-
-        # leave the same city‐circle padding and gap logic
-        off = 15
-        gap = 4
-        rect_w = 8
-        colors = [c.name.lower() for c in conn.cost]
-        n = len(colors)
-        if n == 0:
-            return
+    def get_route_shifts(self):
+        """
+        Returns list of (connection, parallel shift) pairs.
+        Connections between the same cities are shifted to opposite sides.
+        """
 
-        usable = dist - 2 * off - gap * (n - 1)
-        seg_len = usable / n
-        sx = x1 + dx * off
-        sy = y1 + dy * off
-
-        # car‐inset factor (20% smaller than full segment)
-        inset = 0.2
-
-        for i, _ in enumerate(colors):
-            # center of this segment
-            center_x = sx + dx * (i * (seg_len + gap) + seg_len / 2)
-            center_y = sy + dy * (i * (seg_len + gap) + seg_len / 2)
-
-            # full‐width segment corners
-            corners = [
-                (
-                    center_x - dx * seg_len / 2 + px * rect_w / 2,
-                    center_y - dy * seg_len / 2 + py * rect_w / 2,
-                ),
-                (
-                    center_x - dx * seg_len / 2 - px * rect_w / 2,
-                    center_y - dy * seg_len / 2 - py * rect_w / 2,
-                ),
-                (
-                    center_x + dx * seg_len / 2 - px * rect_w / 2,
-                    center_y + dy * seg_len / 2 - py * rect_w / 2,
-                ),
-                (
-                    center_x + dx * seg_len / 2 + px * rect_w / 2,
-                    center_y + dy * seg_len / 2 + py * rect_w / 2,
-                ),
-            ]
-
-            # inset each corner toward the center
-            car = []
-            for cx, cy in corners:
-                ix = center_x + (cx - center_x) * (1 - inset)
-                iy = center_y + (cy - center_y) * (1 - inset)
-                car.append((ix, iy))
-            player_color = self.player_colors.get(conn.claimed_by, (0, 0, 0))
-
-            # draw the car
-            pygame.draw.polygon(self.screen, player_color, car)
-            pygame.draw.polygon(self.screen, (255, 255, 255), car, 2)
-
-    def draw_routes(self):
         grouped = {}
         for conn in self.connections:
             a, b = list(conn.cities)
             key = tuple(sorted((a.name, b.name)))
             grouped.setdefault(key, []).append(conn)
 
+        route_shifts = []
         for conns in grouped.values():
             for i, conn in enumerate(conns):
                 shift = 0 if len(conns) == 1 else 0.2 * (-1 if i == 0 else 1)
-                self.draw_route(conn, shift)
-                if conn.claimed_by is not None:
-                    col = self.player_colors[conn.claimed_by]
-                    self.draw_player_trains(conn, shift)
-
-    def draw_route(self, conn: CityConnection, parallel_shift=0):
-        # conn.cities to set{City, City}
-        a, b = list(conn.cities)
-        x1, y1 = self.scale_coordinates(*a.point)
-        x2, y2 = self.scale_coordinates(*b.point)
-        dx, dy = x2 - x1, y2 - y1
-        dist = math.hypot(dx, dy)
-        if dist == 0:
-            return
-        dx, dy = dx / dist, dy / dist
-        px, py = -dy, dx
+                route_shifts.append((conn, shift))
 
-        colors = [c.name.lower() for c in conn.cost]
-        n = len(colors)
-        if n == 0:
-            return
+        return route_shifts
+
+    def get_route_geometry(self):
+        """
+        Returns polygons of all routes computed for the current screen size.
+        """
+
+        size = self.screen.get_size()
+
+        if self.route_geometry is None or self.route_geometry_size != size:
+            self.route_geometry = RouteGeometry(self.route_shifts, self.scale_coordinates)
+            self.route_geometry_size = size
+
+        return self.route_geometry
+
+    def draw_routes(self, surface=None):
+        for conn, _ in self.route_shifts:
+            self.draw_route(conn, surface)
+
+    def draw_claimed_trains(self, surface=None):
+        for conn, _ in self.route_shifts:
+            if conn.claimed_by is not None:
+                self.draw_player_trains(conn, surface)
+
+    def draw_claimable_routes(self):
+        """
+        Outlines the routes the current player can claim with the cards in hand.
+        """
+
+        segments = self.get_route_geometry().segments
+
+        # In dirty redraw mode the routes are picked by pop_dirty_rects, together with the rectangles to update
+        routes = self.drawn_claimable_routes if self.dirty_redraw else self.get_claimable_routes()
+
+        for route_id in routes:
+            for corners in segments[route_id]:
+                pygame.draw.polygon(self.screen, self.highlight_color, corners, self.highlight_width)
+
+    def get_claimable_routes(self):
+        """
+        Returns set of ids of the routes the current player can claim.
+        The payment search runs only when the turn, the hand or the claimed routes change, not every frame.
+        """
+
+        game = self.game
+        player = game.players[game.current_player_index]
+
+        if game.setup_players_left or game.game_over:
+            key = None  # Nothing is highlighted
+        else:
+            # Every claim takes trains, so their total changes whenever a route gets claimed
+            key = (game.current_player_index, tuple(player.train_cards.counts), sum(other.trains for other in game.players))
+
+        if key != self.claimable_key:
+            self.claimable_routes = (
+                frozenset() if key is None else frozenset(conn.id for conn, _ in game.claimable_connections(player))
+            )
+            self.claimable_key = key
+
+        return self.claimable_routes
+
+    def draw_route(self, conn: CityConnection, surface=None):
+        if surface is None:
+            surface = self.screen
+
+        segments = self.get_route_geometry().segments[conn.id]
 
-        # shift double‐route
-        if parallel_shift:
-            x1 += px * parallel_shift * 25
-            y1 += py * parallel_shift * 25
-            x2 += px * parallel_shift * 25
-            y2 += py * parallel_shift * 25
-            dx, dy = x2 - x1, y2 - y1
-            dist = math.hypot(dx, dy)
-            dx, dy = dx / dist, dy / dist
-
-        colors = [c.name.lower() for c in conn.cost]
-        seg_w, gap, off = 10, 4, 15
-        n = len(colors)
-        usable = dist - 2 * off - gap * (n - 1)
-        seg_len = usable / n
-        sx, sy = x1 + dx * off, y1 + dy * off
-
-        for i, col in enumerate(colors):
-            cx = sx + dx * (i * (seg_len + gap) + seg_len / 2)
-            cy = sy + dy * (i * (seg_len + gap) + seg_len / 2)
-            w, h = seg_len, seg_w
-            corners = [
-                (cx - dx * w / 2 + px * h / 2, cy - dy * w / 2 + py * h / 2),
-                (cx - dx * w / 2 - px * h / 2, cy - dy * w / 2 - py * h / 2),
-                (cx + dx * w / 2 - px * h / 2, cy + dy * w / 2 - py * h / 2),
-                (cx + dx * w / 2 + px * h / 2, cy + dy * w / 2 + py * h / 2),
-            ]
-            color = self.color_map.get(col, (128, 128, 128))
-            pygame.draw.polygon(self.screen, color, corners)
-            pygame.draw.polygon(self.screen, (0, 0, 0), corners, 1)
+        for card, corners in zip(conn.cost, segments):
+            color = self.color_map.get(card.name.lower(), (128, 128, 128))
+            pygame.draw.polygon(surface, color, corners)
+            pygame.draw.polygon(surface, (0, 0, 0), corners, 1)
 
     def draw_player_cards(self):
         player = self.game.players[self.game.current_player_index]
+        # Calculate dynamic card size based on window dimensions
+        current_width, current_height = self.screen.get_size()
+        card_width = int(current_width * 0.06)  # 6% of window width
+        card_height = int(card_width * (1200 / 1900))  # Maintain aspect ratio
+        y = current_height * 0.05  # Place near the bottom of the screen
+
         # Draw player cards
         for i, card in enumerate(player.train_cards):
-            # Calculate dynamic card size based on window dimensions
-            current_width, current_height = self.screen.get_size()
-            card_width = int(current_width * 0.06)  # 6% of window width
-            card_height = int(card_width * (1200 / 1900))  # Maintain aspect ratio
-
             # Calculate card position dynamically based on screen size
             x = current_width * 0.05 + i * (current_width * 0.05)  # 5% margin + spacing
-            y = current_height * 0.05  # Place near the bottom of the screen
 
-            # Construct the file path for the card image
-            card_image_path = os.path.join(
-                self.cards_folder_path, f"{card.name.lower()}.jpg"
-            )
+            card_image_name = f"{card.name.lower()}.jpg"
 
             try:
-                # Load the card image
-                card_image = pygame.image.load(card_image_path)
-
-                # Scale the card image to fit the dynamically calculated dimensions
-                card_image = pygame.transform.scale(
-                    card_image, (card_width, card_height)
-                )
-
-                # Draw the card image on the screen
+                # Draw the cached, scaled card image on the screen
+                card_image = self.get_card_image(card_image_name, (card_width, card_height))
                 self.screen.blit(card_image, (x, y))
             except pygame.error as e:
-                print(f"Error loading card image {card_image_path}: {e}")
+                print(f"Error loading card image {card_image_name}: {e}")
 
                 # Fallback: Draw a placeholder rectangle if the image fails to load
                 pygame.draw.rect(
@@ -346,7 +545,7 @@ class GUI:
                 )
 
         # Draw the player's name above their cards
-        font = pygame.font.Font(None, 36)  # Use a larger font size for the name
+        font = self.get_font(36)  # Use a larger font size for the name
         text = font.render(
             player.name, True, (0, 0, 0)
         )  # Render the player's name in black
@@ -371,15 +570,9 @@ class GUI:
             x = current_width * 0.05 + i * (current_width * 0.05)  # 5% margin + spacing
             y = current_height * 0.15  # Place near the bottom of the screen
 
-            image = self.create_image_from_ticket(ticket)
-            # Scale the card image to fit the dynamically calculated dimensions
-            image = pygame.transform.scale(image, (card_width, card_height))
-            # Draw the card image on the screen
+            # Draw the cached ticket image on the screen
+            image = self.get_ticket_image(ticket, (card_width, card_height))
             self.screen.blit(image, (x, y))
-            # Draw the label "Destination Tickets" above the destination tickets
-            font = pygame.font.Font(None, 16)  # Use a larger font size for the label
-            label_text = "Destination Tickets"
-            text = font.render(label_text, True, (0, 0, 0))  # Render the label in black
 
     def draw_open_cards(self):
         # Draw open cards deck on the upper part of the screen
@@ -391,6 +584,10 @@ class GUI:
             card_width = int(current_width * 0.06)  # 6% of window width
             card_height = int(card_width * (1200 / 1900))  # Maintain aspect ratio
 
+            # Empty slot, the train cards deck ran out
+            if card is None:
+                continue
+
             # Calculate card position dynamically based on screen size
             x = current_width * self.game.open_cards_deck.screen_position[0] + i * (
                 card_width + current_width * 0.01
@@ -399,24 +596,14 @@ class GUI:
                 current_height * self.game.open_cards_deck.screen_position[1]
             )  # Place near the top of the screen
 
-            # Construct the file path for the card image
-            card_image_path = os.path.join(
-                self.cards_folder_path, f"{card.name.lower()}.jpg"
-            )
+            card_image_name = f"{card.name.lower()}.jpg"
 
             try:
-                # Load the card image
-                card_image = pygame.image.load(card_image_path)
-
-                # Scale the card image to fit the dynamically calculated dimensions
-                card_image = pygame.transform.scale(
-                    card_image, (card_width, card_height)
-                )
-
-                # Draw the card image on the screen
+                # Draw the cached, scaled card image on the screen
+                card_image = self.get_card_image(card_image_name, (card_width, card_height))
                 self.screen.blit(card_image, (x, y))
             except pygame.error as e:
-                print(f"Error loading card image {card_image_path}: {e}")
+                print(f"Error loading card image {card_image_name}: {e}")
 
                 # Fallback: Draw a placeholder rectangle if the image fails to load
                 pygame.draw.rect(
@@ -427,7 +614,7 @@ class GUI:
                 )
 
         # Draw the label "Open Cards" above the open cards
-        font = pygame.font.Font(None, 36)  # Use a larger font size for the label
+        font = self.get_font(36)  # Use a larger font size for the label
         label_text = "Open Cards"
         text = font.render(label_text, True, (0, 0, 0))  # Render the label in black
         text_rect = text.get_rect(
@@ -449,20 +636,14 @@ class GUI:
         x = current_width * self.game.train_cards_deck.screen_position[0]
         y = current_height * self.game.train_cards_deck.screen_position[1]
 
-        # Construct the file path for the card image
-        card_image_path = os.path.join(self.cards_folder_path, "train_ticket_card.jpg")
+        card_image_name = "train_ticket_card.jpg"
 
         try:
-            # Load the card image
-            card_image = pygame.image.load(card_image_path)
-
-            # Scale the card image to fit the dynamically calculated dimensions
-            card_image = pygame.transform.scale(card_image, (card_width, card_height))
-
-            # Draw the card image on the screen
+            # Draw the cached, scaled card image on the screen
+            card_image = self.get_card_image(card_image_name, (card_width, card_height))
             self.screen.blit(card_image, (x, y))
         except pygame.error as e:
-            print(f"Error loading card image {card_image_path}: {e}")
+            print(f"Error loading card image {card_image_name}: {e}")
 
             # Fallback: Draw a placeholder rectangle if the image fails to load
             pygame.draw.rect(
@@ -471,7 +652,7 @@ class GUI:
             pygame.draw.rect(self.screen, (0, 0, 0), (x, y, card_width, card_height), 1)
 
         # Draw the label "Trains Deck" above the trains deck
-        font = pygame.font.Font(None, 36)  # Use a larger font size for the label
+        font = self.get_font(36)  # Use a larger font size for the label
         label_text = "Trains Deck"
         text = font.render(label_text, True, (0, 0, 0))  # Render the label in black
         text_rect = text.get_rect(
@@ -491,17 +672,13 @@ class GUI:
         x = current_width * self.game.destination_tickets_deck.screen_position[0]
         y = current_height * self.game.destination_tickets_deck.screen_position[1]
 
-        card_image_path = os.path.join(
-            self.cards_folder_path, "destination_ticket_card.jpg"
+        # Draw the cached, scaled card image on the screen
+        card_image = self.get_card_image(
+            "destination_ticket_card.jpg", (card_width, card_height)
         )
-        # Load the card image
-        card_image = pygame.image.load(card_image_path)
-        # Scale the card image to fit the dynamically calculated dimensions
-        card_image = pygame.transform.scale(card_image, (card_width, card_height))
-        # Draw the card image on the screen
         self.screen.blit(card_image, (x, y))
         # Draw the label "Destination Cards" above the destination cards
-        font = pygame.font.Font(None, 36)  # Use a larger font size for the label
+        font = self.get_font(36)  # Use a larger font size for the label
         label_text = "Destination Cards"
         text = font.render(label_text, True, (0, 0, 0))  # Render the label in black
         text_rect = text.get_rect(
@@ -525,15 +702,37 @@ class GUI:
             y = current_height * 0.7  # Place near the bottom of the screen
             # Construct the file path for the card image
 
-            image = self.create_image_from_ticket(card)
-            # Scale the card image to fit the dynamically calculated dimensions
-            image = pygame.transform.scale(image, (card_width, card_height))
-            # Draw the card image on the screen
+            # Draw the cached ticket image on the screen
+            image = self.get_ticket_image(card, (card_width, card_height))
             self.screen.blit(image, (x, y))
-            # Draw the label "Destination Tickets" above the destination tickets
-            font = pygame.font.Font(None, 16)  # Use a larger font size for the label
-            label_text = "Destination Tickets"
-            text = font.render(label_text, True, (0, 0, 0))  # Render the label in black
+
+        if self.show_ticket_estimates:
+            font = self.get_font(int(card_width * 0.2))
+
+            for i, (probability, expected_points) in enumerate(self.get_ticket_estimates()):
+                x = current_width * 0.7 + i * (card_width + spacing)
+                y = current_height * 0.7 + card_height + 2
+                text = font.render(f"{probability:.0%} ({expected_points:.1f} pts)", True, (0, 0, 0))
+                self.screen.blit(text, (x, y))
+
+    def get_ticket_estimates(self):
+        """
+        Returns (completion probability, expected points) of the destination tickets to choose
+        for the current player, estimated once for every offer.
+        """
+
+        tickets = self.game.destination_tickets_to_choose
+        key = (tuple(id(ticket) for ticket in tickets), self.game.current_player_index)
+
+        if self.ticket_estimates_key != key:
+            if self.ticket_estimator is None:
+                self.ticket_estimator = TicketEstimator(self.game.map.compiled)
+
+            player = self.game.players[self.game.current_player_index]
+            self.ticket_estimates = self.ticket_estimator.estimate(self.game, player, tickets)
+            self.ticket_estimates_key = key
+
+        return self.ticket_estimates
 
     def create_image_from_ticket(self, ticket):
 
@@ -548,7 +747,7 @@ class GUI:
 
         # Draw the ticket details on the surface
         font_size = int(card_width * 0.15)  # Adjust font size relative to card width
-        font = pygame.font.Font(None, font_size)
+        font = self.get_font(font_size)
         text = f"{ticket.start_city} - {ticket.end_city}"
         text_surface = font.render(text, True, (0, 0, 0))
         text_rect = text_surface.get_rect(center=(card_width // 2, card_height // 3))
@@ -589,170 +788,308 @@ class GUI:
         scale_x, scale_y = self.get_scaling_factor()
         return int(x * scale_x), int(y * scale_y)
 
-    def get_clicked_city(self, event):
+    def get_hit_index(self):
         """
-        Check if a city was clicked based on the mouse event.
+        Returns the spatial index of clickable zones: cities, open cards, decks,
+        destination tickets to choose and route segments.
+        Index is rebuilt only when the screen size or number of shown cards changes.
         """
-        for city in self.cities:
-            # Scale city coordinates
-            city_point = self.scale_coordinates(*city.point)
-            city_rect = pygame.draw.circle(
-                self.screen, (0, 0, 0), city_point, self.city_radius
-            )
-            if city_rect.collidepoint(event.pos):
-                return city
 
-    def get_open_card_index(self, event):
-        """
-        Check if an open card was clicked based on the mouse event.
-        """
+        key = (
+            self.screen.get_size(),
+            len(self.game.open_cards_deck.cards),
+            len(self.game.destination_tickets_to_choose),
+        )
+
+        if self.hit_index is not None and self.hit_index_key == key:
+            return self.hit_index
+
         current_width, current_height = self.screen.get_size()
         card_width = int(current_width * 0.06)
         card_height = int(card_width * (1200 / 1900))
-        for i, card in enumerate(self.game.open_cards_deck.cards):
+        spacing = int(current_width * 0.02)  # Spacing between destination tickets to choose
+
+        index = SpatialIndex()
+
+        for city in self.cities:
+            index.add_circle("city", city, self.scale_coordinates(*city.point), self.city_radius)
+
+        for i in range(len(self.game.open_cards_deck.cards)):
             x = current_width * self.game.open_cards_deck.screen_position[0] + i * (
                 card_width + current_width * 0.01
             )
             y = current_height * self.game.open_cards_deck.screen_position[1]
-            card_rect = pygame.Rect(x, y, card_width, card_height)
-            if card_rect.collidepoint(event.pos):
-                return i
-        return None
+            index.add_rect("open_card", i, (x, y, card_width, card_height))
+
+        for kind, deck in (
+            ("train_cards_deck", self.game.train_cards_deck),
+            ("destination_tickets_deck", self.game.destination_tickets_deck),
+        ):
+            x = current_width * deck.screen_position[0]
+            y = current_height * deck.screen_position[1]
+            index.add_rect(kind, True, (x, y, card_width, card_height))
+
+        for i in range(len(self.game.destination_tickets_to_choose)):
+            x = current_width * 0.7 + i * (card_width + spacing)
+            y = current_height * 0.7
+            index.add_rect("destination_ticket", i, (x, y, card_width, card_height))
+
+        route_geometry = self.get_route_geometry()
+        for route_id, segments in route_geometry.segments.items():
+            for segment in segments:
+                index.add_polygon("route", route_id, segment)
+
+        self.hit_index = index
+        self.hit_index_key = key
+
+        return index
+
+    def get_clicked_city(self, event):
+        """
+        Check if a city was clicked based on the mouse event.
+        """
+        return self.get_hit_index().find(event.pos, "city")
+
+    def get_clicked_connection(self, event):
+        """
+        Check if a route segment was clicked based on the mouse event.
+        """
+        route_id = self.get_hit_index().find(event.pos, "route")
+        return None if route_id is None else self.game.map.connections[route_id]
+
+    def get_open_card_index(self, event):
+        """
+        Check if an open card was clicked based on the mouse event.
+        """
+        return self.get_hit_index().find(event.pos, "open_card")
 
     def get_destination_tickets_to_choose_index(self, event):
         """
         Check if a destination ticket was clicked based on the mouse event.
         """
-        current_width, current_height = self.screen.get_size()
-        card_width = int(current_width * 0.06)
-        card_height = int(card_width * (1200 / 1900))
-        spacing = int(current_width * 0.02)  # Add spacing between cards
-
-        for i, card in enumerate(self.game.destination_tickets_to_choose):
-            x = current_width * 0.7 + i * (card_width + spacing)
-            y = current_height * 0.7
-            card_rect = pygame.Rect(x, y, card_width, card_height)
-            if card_rect.collidepoint(event.pos):
-                return i
-        return None
+        return self.get_hit_index().find(event.pos, "destination_ticket")
 
     def get_if_train_cards_clicked(self, event):
         """
         Check if an open card was clicked based on the mouse event.
         """
-        current_width, current_height = self.screen.get_size()
-        card_width = int(current_width * 0.06)
-        card_height = int(card_width * (1200 / 1900))
-        x = current_width * self.game.train_cards_deck.screen_position[0]
-        y = current_height * self.game.train_cards_deck.screen_position[1]
-        card_rect = pygame.Rect(x, y, card_width, card_height)
-        if card_rect.collidepoint(event.pos):
-            return True
-        return False
+        return self.get_hit_index().find(event.pos, "train_cards_deck") is not None
 
     def destination_tickets_clicked(self, event):
         """
         Check if the destination tickets deck was clicked based on the mouse event.
         """
-        current_width, current_height = self.screen.get_size()
-        card_width = int(current_width * 0.06)
-        card_height = int(card_width * (1200 / 1900))
-        x = current_width * self.game.destination_tickets_deck.screen_position[0]
-        y = current_height * self.game.destination_tickets_deck.screen_position[1]
-        card_rect = pygame.Rect(x, y, card_width, card_height)
-        if card_rect.collidepoint(event.pos):
+        return self.get_hit_index().find(event.pos, "destination_tickets_deck") is not None
+
+    def get_player_action(self, timeout: float = None):
+        """
+        Returns the next player action, blocks until the player makes one.
+        Raises queue.Empty if there was no action within 'timeout' seconds.
+        """
+
+        return self.actions.get(timeout=timeout)
+
+    def handle_event(self, event):
+        """
+        Translates the pygame event into a player action and puts it into the actions queue.
+        Returns False if the window was closed.
+        """
+
+        if event.type == pygame.QUIT:
+            self.actions.put(QuitGame())
+            return False
+
+        if self.handle_window_event(event):
             return True
-        return False
 
-    def get_player_action(self):
-
-        clicked_cities = set()
-        while True:
-            if getattr(self, "parallel_choice_mode", False):
-                for event in pygame.event.get():
-                    if event.type == pygame.QUIT:
-                        pygame.quit()
-                        exit(0)
-
-                    if event.type == pygame.MOUSEBUTTONDOWN:
-                        pos = event.pos
-                        if self.parallel_rects[0] and self.parallel_rects[0].collidepoint(pos):
-                            self.parallel_choice_mode = False
-                            return 0, "parallel_choice"
-                        if self.parallel_rects[1] and self.parallel_rects[1].collidepoint(pos):
-                            self.parallel_choice_mode = False
-                            return 1, "parallel_choice"
-                pygame.time.delay(10)
-                continue
-            for event in pygame.event.get():
-                if event.type == pygame.MOUSEBUTTONDOWN:
+        if event.type == pygame.MOUSEBUTTONDOWN:
+            action = self.get_action_from_click(event)
 
-                    city = self.get_clicked_city(event)
-                    if city:
-                        if city not in clicked_cities:
-                            clicked_cities.add(city)
-                            print(f"Clicked on city: {city.name}")
+            if action is not None:
+                self.actions.put(action)
 
-                            if len(clicked_cities) == 2:
-                                return clicked_cities, "create_connection"
+        return True
 
-                        continue
+    def get_action_from_click(self, event):
+        """
+        Returns the action for the mouse click.
+        Returns None if the click only selected the first of two cities.
+        """
 
-                    open_card_index = self.get_open_card_index(event)
+        if self.parallel_choice_mode:
+            pos = event.pos
+            if self.parallel_rects[0] and self.parallel_rects[0].collidepoint(pos):
+                self.parallel_choice_mode = False
+                self.mark_dirty("all")
+                return ChooseParallelConnection(0)
+            if self.parallel_rects[1] and self.parallel_rects[1].collidepoint(pos):
+                self.parallel_choice_mode = False
+                self.mark_dirty("all")
+                return ChooseParallelConnection(1)
+            return None
+
+        city = self.get_clicked_city(event)
+        if city:
+            if city not in self.clicked_cities:
+                self.clicked_cities.append(city)
+                print(f"Clicked on city: {city.name}")
+
+                if len(self.clicked_cities) == 2:
+                    city1, city2 = self.clicked_cities
+                    self.clicked_cities = []
+                    return SelectCities(city1, city2)
+
+            return None
+
+        # Any other click cancels selecting cities
+        self.clicked_cities = []
+
+        open_card_index = self.get_open_card_index(event)
+
+        if open_card_index is not None:
+            card = self.game.open_cards_deck.cards[open_card_index]
+            if card is not None:
+                print(f"Clicked on open card: {open_card_index} - {card.name}")
+                return DrawOpenCard(open_card_index)
+
+        if self.get_if_train_cards_clicked(event):
+            print("Clicked on train cards deck.")
+            return DrawTrainCard()
+
+        if self.destination_tickets_clicked(event):
+            print("Clicked on destination tickets deck.")
+            return DrawDestinationTickets()
+
+        destination_ticket_index = self.get_destination_tickets_to_choose_index(event)
+        if (
+            destination_ticket_index is not None
+            and self.if_draw_destination_tickets_to_choose
+        ):
+            print(f"Clicked on destination ticket: {destination_ticket_index}")
+            return ChooseDestinationTicket(destination_ticket_index)
+
+        conn = self.get_clicked_connection(event)
+        if conn is not None and not self.if_draw_destination_tickets_to_choose:
+            print(f"Clicked on connection: {conn}")
+            return ClaimConnection(conn)
+
+        return Skip()
+
+    def mark_dirty(self, *regions: str):
+        """
+        Marks screen regions as changed, used in dirty redraw mode.
+        Regions: "all", "board", "hand", "open_cards", "decks", "tickets_to_choose"
+        and ("route", route id) for a single route.
+        """
 
-                    if open_card_index is not None:
-                        card = self.game.open_cards_deck.cards[open_card_index]
-                        print(f"Clicked on open card: {open_card_index} - {card.name}")
-                        return open_card_index, "open_card_index"
+        if not self.dirty_redraw or self.game.quit_requested:
+            return
 
-                    if self.get_if_train_cards_clicked(event):
-                        print("Clicked on train cards deck.")
-                        return "train_cards_deck"
+        with self.dirty_lock:
+            if self.closed:
+                return
 
-                    if self.destination_tickets_clicked(event):
-                        print("Clicked on destination tickets deck.")
-                        return "destination_tickets_deck"
+            self.dirty_regions.update(regions)
 
-                    destination_ticket_index = (
-                        self.get_destination_tickets_to_choose_index(event)
-                    )
-                    if (
-                        destination_ticket_index is not None
-                        and self.if_draw_destination_tickets_to_choose
-                    ):
-                        print(
-                            f"Clicked on destination ticket: {destination_ticket_index}"
-                        )
-                        return destination_ticket_index, "destination_ticket_index"
+            # Wakes up the GUI loop waiting for events
+            pygame.event.post(pygame.event.Event(REDRAW_EVENT))
 
-                    return None, "skip"
+    def get_region_rect(self, region: str):
+        """
+        Returns the screen rectangle of the region.
+        """
 
-    def run(self):
+        current_width, current_height = self.screen.get_size()
+        card_width = int(current_width * 0.06)
+        card_height = int(card_width * (1200 / 1900))
 
-        running = True
-        while running:
-            # for event in pygame.event.get():
-            #     if event.type == pygame.QUIT:
-            #         running = False
-            #     elif event.type == pygame.MOUSEBUTTONDOWN:
+        match region:
+            case "hand":
+                # Player name, train cards and destination tickets
+                return pygame.Rect(0, 0, current_width, current_height * 0.15 + card_height)
+            case "open_cards":
+                x = current_width * self.game.open_cards_deck.screen_position[0]
+                return pygame.Rect(x, 0, current_width - x, current_height * 0.02 + card_height)
+            case "decks":
+                x = current_width * self.game.train_cards_deck.screen_position[0]
+                y = current_height * self.game.train_cards_deck.screen_position[1] - 50
+                bottom = (
+                    current_height * self.game.destination_tickets_deck.screen_position[1]
+                    + card_height
+                )
+                return pygame.Rect(x - card_width, y, current_width - x + card_width, bottom - y)
+            case ("route", route_id):
+                min_x, min_y, max_x, max_y = self.get_route_geometry().bounds[route_id]
+                rect = pygame.Rect(min_x, min_y, max_x - min_x, max_y - min_y)
+                return rect.inflate(2 * self.highlight_width + 2, 2 * self.highlight_width + 2)
+            case "tickets_to_choose":
+                # Tickets and their completion estimates under them
+                x = current_width * 0.7
+                y = current_height * 0.7
+                return pygame.Rect(x, y, current_width - x, card_height + int(card_width * 0.2) + 2)
+            case _:
+                # "all", "board" - claimed trains can be anywhere on the map
+                return self.screen.get_rect()
+
+    def pop_dirty_rects(self):
+        """
+        Returns rectangles of the regions marked as dirty and clears them.
+        Routes whose highlight differs from the screen are added here, in the GUI thread,
+        so a game state change is never missed between the redraw and its mark_dirty call.
+        """
 
-            # city = self.get_clicked_city(event)
-            # if city:
-            #     print(f"Clicked on city: {city.name}")
+        with self.dirty_lock:
+            regions = self.dirty_regions
+            self.dirty_regions = set()
 
-            # open_card_index = self.get_open_card_index(event)
-            # if open_card_index is not None:
-            #     card = self.game.open_cards_deck.cards[open_card_index]
-            #     print(f"Clicked on open card: {open_card_index} - {card.name}")
+        if self.highlight_claimable:
+            claimable = self.get_claimable_routes()
+            regions.update(("route", route_id) for route_id in self.drawn_claimable_routes ^ claimable)
+            self.drawn_claimable_routes = claimable
 
-            # if self.get_if_train_cards_clicked(event):
-            #     print("Clicked on train cards deck.")
+        return [self.get_region_rect(region) for region in regions]
 
-            # if self.destination_tickets_clicked(event):
-            #     print("Clicked on destination tickets deck.")
+    def run(self):
 
-            self.draw()
-            pygame.display.flip()
-            self.clock.tick(60)
+        running = True
+        while running:
+            if self.dirty_redraw:
+                # Sleep until there is an input event or a redraw request
+                events = [pygame.event.wait(self.idle_timeout)] + pygame.event.get()
+            else:
+                events = pygame.event.get()
+
+            for event in events:
+                if not self.handle_event(event):
+                    running = False
+
+            if not running:
+                break
+
+            if self.dirty_redraw:
+                dirty_rects = self.pop_dirty_rects()
+
+                if not dirty_rects:
+                    continue
+
+                with self.render_timer.measure("frame"):
+                    self.draw()
+                pygame.display.update(dirty_rects)
+            else:
+                with self.render_timer.measure("frame"):
+                    self.draw()
+                pygame.display.flip()
+                self.clock.tick(60)
+
+            self.frame_count += 1
+            if (
+                self.timings_report_interval
+                and self.frame_count % self.timings_report_interval == 0
+            ):
+                print(self.render_timer)
+                self.render_timer.reset()
+
+        with self.dirty_lock:
+            self.closed = True
 
         pygame.quit()
@@ -0,0 +1,260 @@
+from disjoint_set import DisjointSet
+from map import CityConnection
+
+
+class LongestRouteSolver:
+    """
+    Finds the longest continuous route of a player (README: 10-point bonus).
+    Route is a trail: cities can be visited many times, but every connection is used at most once.
+    Connections are added incrementally and only the component touched by the last claim is solved again.
+    """
+
+    def __init__(self):
+        self.edges = []  # (city1 name, city2 name, length)
+        self.components = DisjointSet()  # Cities of the connected parts of the network
+        self.component_lengths = {}  # frozenset of edge indices -> longest route in this component
+
+    def add_connection(self, conn: CityConnection):
+        """
+        Adds the claimed connection to the network.
+        """
+
+        city1, city2 = (city.name for city in conn.cities)
+        self.add_edge(city1, city2, len(conn.cost))
+
+    def add_edge(self, city1, city2, length: int):
+        """
+        Adds the connection given by its cities (any hashable ids) and length.
+        """
+
+        self.edges.append((city1, city2, length))
+        self.components.union(city1, city2)
+
+    def get_components(self):
+        """
+        Returns lists of edge indices of the connected parts of the network.
+        """
+
+        components = {}
+        for i, (city1, _, _) in enumerate(self.edges):
+            components.setdefault(self.components.find(city1), []).append(i)
+
+        return list(components.values())
+
+    def longest(self):
+        """
+        Returns the length (number of trains) of the longest continuous route.
+        """
+
+        best = 0
+
+        for component in self.get_components():
+            key = frozenset(component)
+            length = self.component_lengths.get(key)
+
+            # Only components changed by new connections are solved again
+            if length is None:
+                length = longest_trail([self.edges[i] for i in component])
+                self.component_lengths[key] = length
+
+            best = max(best, length)
+
+        return best
+
+
+def reduce_network(edges: list[tuple[str, str, int]]):
+    """
+    Simplifies the network without changing the length of its longest trail:
+    - connection to a dead end can only be the first or the last one of the trail,
+      so only two longest dead-end connections of a city are kept,
+    - city with exactly two connections is passed by using both of them one after another
+      (and having even degree it cannot be the end of the longest trail),
+      so these connections are replaced by one longer connection.
+    Player networks are mostly tree-like, so only a small core with cycles is left for the search.
+    """
+
+    edges = list(edges)
+
+    while True:
+        city_edges = {}
+        for i, (city1, city2, _) in enumerate(edges):
+            city_edges.setdefault(city1, []).append(i)
+            if city2 != city1:
+                city_edges.setdefault(city2, []).append(i)
+
+        removed = set()
+        for city, indices in city_edges.items():
+            dead_ends = [
+                i
+                for i in indices
+                if len(city_edges[edges[i][0] if edges[i][1] == city else edges[i][1]]) == 1
+                and edges[i][0] != edges[i][1]
+            ]
+            if len(dead_ends) > 2:
+                dead_ends.sort(key=lambda i: edges[i][2], reverse=True)
+                removed.update(dead_ends[2:])
+
+        if removed:
+            edges = [edge for i, edge in enumerate(edges) if i not in removed]
+            continue
+
+        for city, indices in city_edges.items():
+            if len(indices) != 2:
+                continue
+
+            i, j = indices
+            city1, city2, length1 = edges[i]
+            city3, city4, length2 = edges[j]
+
+            # Self-loops are left as they are
+            if city1 == city2 or city3 == city4:
+                continue
+
+            other1 = city2 if city1 == city else city1
+            other2 = city4 if city3 == city else city3
+
+            edges = [edge for k, edge in enumerate(edges) if k not in (i, j)]
+            edges.append((other1, other2, length1 + length2))
+            break
+        else:
+            return edges
+
+
+def longest_trail(edges: list[tuple[str, str, int]]):
+    """
+    Returns the length of the longest trail in the connected graph given as (city1, city2, length) edges.
+    Depth-first search over the cycles-containing core of the network, used edges are kept in a bitmask.
+    """
+
+    edges = reduce_network(edges)
+    total_length = sum(length for _, _, length in edges)
+
+    if len(edges) == 1:
+        return total_length
+
+    degrees = {}
+    for city1, city2, _ in edges:
+        degrees[city1] = degrees.get(city1, 0) + 1
+        degrees[city2] = degrees.get(city2, 0) + 1
+
+    # If all degrees are even, the longest trail is a closed one using every connection (Euler circuit)
+    if all(degree % 2 == 0 for degree in degrees.values()):
+        return total_length
+
+    # Dead-end connections can only be the first or the last one of the trail, they are not part of the search.
+    # City -> lengths of its (at most two) dead-end connections, the longest first.
+    dead_ends = {}
+    core_edges = []
+    for city1, city2, length in edges:
+        if degrees[city1] == 1 or degrees[city2] == 1:
+            city = city2 if degrees[city1] == 1 else city1
+            dead_ends.setdefault(city, []).append(length)
+            dead_ends[city].sort(reverse=True)
+        else:
+            core_edges.append((city1, city2, length))
+
+    adjacency = {city: [] for city in degrees}
+    city_bits = {city: 0 for city in degrees}  # City -> bitmask of its core edges
+    for i, (city1, city2, length) in enumerate(core_edges):
+        adjacency[city1].append((city2, 1 << i, length))
+        city_bits[city1] |= 1 << i
+        city_bits[city2] |= 1 << i
+
+        if city2 != city1:
+            adjacency[city2].append((city1, 1 << i, length))
+
+    def end_length(city, start):
+        """
+        Returns the length of the dead-end connection the trail can finish with in 'city'.
+        The longest dead end of the start city is already used by the trail.
+        """
+
+        lengths = dead_ends.get(city, ())
+        index = 1 if city == start else 0
+
+        return lengths[index] if len(lengths) > index else 0
+
+    def reachable(city, unused):
+        """
+        Returns the bitmask of unused core edges reachable from 'city'.
+        """
+
+        found = 0
+        stack = [city]
+
+        while stack:
+            current = stack.pop()
+            for neighbour, bit, _ in adjacency[current]:
+                if unused & bit and not found & bit:
+                    found |= bit
+                    stack.append(neighbour)
+
+        return found
+
+    def upper_bound(city, unused, start):
+        """
+        Returns the upper bound of the trail length from 'city' over the unused core edges and one dead end.
+        Every city with odd number of unused edges, except two ends of the trail, keeps one of its edges unused.
+        """
+
+        unused_degrees = {}
+        unused_lengths = []
+        for i, (city1, city2, length) in enumerate(core_edges):
+            if unused >> i & 1:
+                unused_degrees[city1] = unused_degrees.get(city1, 0) + 1
+                unused_degrees[city2] = unused_degrees.get(city2, 0) + 1
+                unused_lengths.append(length)
+
+        odd_cities = sum(1 for degree in unused_degrees.values() if degree % 2 == 1)
+        unused_lengths.sort()
+        end = max(end_length(end_city, start) for end_city in [city, *unused_degrees])
+
+        return sum(unused_lengths) - sum(unused_lengths[: max(0, odd_cities // 2 - 1)]) + end
+
+    # (city, reachable unused core edges, start city) -> the longest trail from the city.
+    # Edges which cannot be reached any more do not matter, so many different paths share the same state.
+    # Start city is kept only while the trail can still come back to it.
+    memo = {}
+
+    def extend(city, unused, start):
+        key = (city, unused, start)
+        if key in memo:
+            return memo[key]
+
+        bound = upper_bound(city, unused, start)
+        best = end_length(city, start)
+
+        for neighbour, bit, length in adjacency[city]:
+            if best == bound:
+                break
+
+            if unused & bit:
+                rest = reachable(neighbour, unused & ~bit)
+                next_start = start if neighbour == start or city_bits.get(start, 0) & rest else None
+                best = max(best, length + extend(neighbour, rest, next_start))
+
+        memo[key] = best
+        return best
+
+    all_edges = (1 << len(core_edges)) - 1
+    best = 0
+
+    for city, degree in degrees.items():
+        if city in dead_ends:
+            # Trail starts with the longest dead end of the city
+            lengths = dead_ends[city]
+            start = city if len(lengths) == 2 and lengths[0] != lengths[1] or len(lengths) == 1 else None
+            length = lengths[0] + extend(city, reachable(city, all_edges), start)
+        elif degree % 2 == 1 and degree > 1:
+            # Longest trail cannot be extended at its ends, so all connections of an end city are used.
+            # Open trail uses odd number of connections at its ends, so it starts in a city with odd degree.
+            length = extend(city, reachable(city, all_edges), None)
+        else:
+            continue
+
+        best = max(best, length)
+
+        if best == total_length:
+            break
+
+    return best
@@ -1,6 +1,7 @@
+from collections import Counter
 from cards import TrainCard
-import yaml
-import os
+from compiled_map import CompiledMap
+from map_config import DEFAULT_CONFIG_FILE, MapConfig
 
 
 class City:
@@ -54,16 +55,13 @@ class CityConnection:
 
         self.cost = cost  # List of train cards needed to create a connection
         self.cities = connected_cities  # Set of connected cities; number of cities should be 2
+        self.id = None  # Index in Map.connections (route id of the compiled graph), set by the map
 
         self.claimed_by = None
 
         if len(connected_cities) != 2:
             raise ValueError("CityConnection should connect exactly two cities")
 
-        connected_cities = list(connected_cities)
-        connected_cities[0].connections.append(self)
-        connected_cities[1].connections.append(self)
-
         for city in connected_cities:
             city.connections.append(self)
 
@@ -113,15 +111,43 @@ class Map:
         self,
         cities: list[City] = None,
         connections: list[CityConnection] = None,
-        config_file: str = os.path.join(
-            os.path.dirname(__file__), "../config//set_europe_close_up/europe_map_close_up.yaml"
-        ),
+        config_file: str = DEFAULT_CONFIG_FILE,
     ):
         self.cities = cities or []
         self.connections = connections or []
+        self._compiled = None
 
         if not cities:
             self.init_cities_from_config(config_file)
+            self.validate()
+
+        for i, conn in enumerate(self.connections):
+            conn.id = i
+
+    @property
+    def compiled(self):
+        """
+        Integer-indexed graph of the map (see CompiledMap), built on the first use.
+        Ids of cities and connections are their indices in self.cities and self.connections.
+        """
+
+        if self._compiled is None:
+            self._compiled = CompiledMap(
+                [(city.name, city.point) for city in self.cities],
+                [(*(city.name for city in conn.cities), conn.cost) for conn in self.connections],
+            )
+
+        return self._compiled
+
+    def get_connections_between(self, city1: City, city2: City):
+        """
+        Returns the list of connections (one or two parallel ones) between both cities.
+        """
+
+        compiled = self.compiled
+        route_ids = compiled.routes_between(compiled.city_ids[city1.name], compiled.city_ids[city2.name])
+
+        return [self.connections[route_id] for route_id in route_ids]
 
     def __str__(self):
         return "Map: [\n" + " ".join(str(city) for city in self.cities) + "]"
@@ -130,38 +156,83 @@ class Map:
         """
         Initializes cities and their connections from a YAML file.
         The YAML file should contain a 'connections' list with city pairs and costs.
+        The file is parsed and validated by MapConfig, which also keeps the compiled graph.
         """
 
-        with open(cities_yaml_file, "r") as file:
-            data = yaml.safe_load(file)
+        config = MapConfig.load(cities_yaml_file)
+        cities_by_name = {}
 
-        for city in data["cities"]:
-
-            city = City(city["name"], (city["x"], city["y"]))
+        for name, point in config.cities:
+            city = City(name, point)
             self.cities.append(city)
+            cities_by_name[name] = city
+
+        for city1_name, city2_name, cost in config.connections:
+            # Create the connection between these two cities
+            conn = CityConnection(list(cost), {cities_by_name[city1_name], cities_by_name[city2_name]})
+            self.connections.append(conn)
+
+        # Ids of the compiled graph are the same as positions in self.cities and self.connections
+        self._compiled = config.compiled
+
+    def validate(self):
+        """
+        Checks integrity of the map graph, raises ValueError listing all problems:
+        duplicated connections, unknown card colors, costs mixing colors, cities missing in the map
+        and connections of a city with itself.
+        Two parallel connections between the same cities are allowed (double routes).
+        """
+
+        errors = []
+        map_cities = set(self.cities)
+
+        city_names = Counter(city.name for city in self.cities)
+        for name, count in city_names.items():
+            if count > 1:
+                errors.append(f"City {name} is defined {count} times")
+
+        if len(set(map(id, self.connections))) != len(self.connections):
+            errors.append("The same connection is added to the map more than once")
+
+        routes_between = Counter()
+
+        for conn in self.connections:
+            cities = list(conn.cities)
+            route = " - ".join(city.name for city in cities)
+
+            if len(cities) != 2 or cities[0].name == cities[1].name:
+                errors.append(f"{route}: connection of the city with itself")
+                continue
+
+            routes_between[frozenset(city.name for city in cities)] += 1
+
+            for city in cities:
+                if city not in map_cities:
+                    errors.append(f"{route}: city {city.name} is not on the map")
+
+                # Every connection is in the adjacency list of its city exactly once
+                registrations = sum(1 for city_conn in city.connections if city_conn is conn)
+                if registrations != 1:
+                    errors.append(f"{route}: registered {registrations} times in connections of {city.name}")
+
+            if not conn.cost:
+                errors.append(f"{route}: empty cost")
+
+            for card in conn.cost:
+                if not isinstance(card, TrainCard):
+                    errors.append(f"{route}: unknown card color '{card}'")
+
+            # Payments (CompiledMap.route_signatures) assume one color or grey, locomotives aside
+            colors = {card for card in conn.cost if card != TrainCard.LOCOMOTIVE}
+            if len(colors) > 1:
+                errors.append(f"{route}: cost mixes colors {', '.join(sorted(str(card) for card in colors))}")
+
+        for cities, count in routes_between.items():
+            if count > 2:
+                errors.append(f"{' - '.join(sorted(cities))}: {count} parallel connections, at most 2 are allowed")
 
-        for connection_data in data["connections"]:
-            cost = []
-            for card_color in connection_data["cost"]:
-                try:
-                    cost.append(TrainCard[card_color.upper()])
-                except KeyError:
-                    print(f"Warning: Unknown card color '{card_color}', skipping")
-
-            # Get the city objects for this connection
-            city1_name, city2_name = connection_data["cities"]
-            city1 = get_city_by_name(self.cities, city1_name)
-            city2 = get_city_by_name(self.cities, city2_name)
-
-            if city1 and city2:
-                # Create the connection between these two cities
-                connected_cities = {city1, city2}
-                conn = CityConnection(cost, connected_cities)
-                self.connections.append(conn)
-            else:
-                print(
-                    print(f"Warning: Could not find cities: {', '.join([city1_name, city2_name])}")
-                )
+        if errors:
+            raise ValueError("Invalid map:\n  " + "\n  ".join(errors))
 
 
 def get_city_by_name(cities, name):
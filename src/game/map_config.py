@@ -0,0 +1,201 @@
+import os
+import pickle
+
+from cards import TrainCard
+from compiled_map import CompiledMap
+
+DEFAULT_CONFIG_FILE = os.path.join(
+    os.path.dirname(__file__), "../config/set_europe_close_up/europe_map_close_up.yaml"
+)
+
+# Increase when MapConfig or CompiledMap changes, old cache files are then ignored
+CACHE_VERSION = 4
+
+# Configs already loaded by this process: absolute path -> MapConfig
+_loaded_configs = {}
+
+
+class MapConfig:
+    """
+    Cities, connections and destination tickets of one map config file, parsed and validated once.
+    Parsed config together with its compiled graph is cached in a pickle file next to the config
+    (__mapcache__ folder), keyed by the modification time and hash of the YAML file.
+    """
+
+    def __init__(
+        self,
+        cities: list[tuple[str, tuple[int, int]]],
+        connections: list[tuple[str, str, list[TrainCard]]],
+        tickets: list[tuple[str, str, int]],
+        source_file: str = None,
+    ):
+        self.cities = cities  # (name, (x, y))
+        self.connections = connections  # (city1 name, city2 name, cost)
+        self.tickets = tickets  # (start city name, end city name, points)
+        self.source_file = source_file
+        self.compiled = None  # CompiledMap, built after validation
+        self.mtime = None  # Modification time (ns) of the source file when it was loaded
+
+    @classmethod
+    def load(cls, config_file: str = DEFAULT_CONFIG_FILE, use_cache: bool = True):
+        """
+        Returns the config of the given file.
+        The YAML file is parsed only if it is not loaded by this process yet and it has no valid cache file.
+        """
+
+        path = os.path.abspath(config_file)
+        mtime = os.stat(path).st_mtime_ns
+
+        config = _loaded_configs.get(path)
+        if config is not None and config.mtime == mtime:
+            return config
+
+        cache_file = get_cache_file(path)
+        cached = read_cache(cache_file) if use_cache else None
+
+        # Unchanged modification time: the file is not even read
+        if cached is not None and cached["mtime"] == mtime:
+            config = cached["config"]
+
+        else:
+            import hashlib
+
+            with open(path, "rb") as file:
+                content = file.read()
+
+            content_hash = hashlib.sha256(content).hexdigest()
+
+            # Touched but not changed file has the same hash
+            if cached is not None and cached["hash"] == content_hash:
+                config = cached["config"]
+            else:
+                config = cls.parse(content, path)
+                config.validate()
+                config.compiled = CompiledMap(config.cities, config.connections)
+
+            if use_cache:
+                write_cache(cache_file, config, mtime, content_hash)
+
+        config.mtime = mtime
+        _loaded_configs[path] = config
+
+        return config
+
+    @classmethod
+    def parse(cls, content: bytes, source_file: str = None):
+        """
+        Creates the config from the YAML content.
+        Raises ValueError if the content has not the expected structure or uses unknown card colors.
+        """
+
+        # YAML is imported only when there is no cache, it is the slowest import of the game
+        import yaml
+
+        # libyaml parser is much faster, pure-Python one is used if PyYAML was built without it
+        data = yaml.load(content, Loader=getattr(yaml, "CSafeLoader", yaml.SafeLoader))
+
+        try:
+            cities = [(city["name"], (city["x"], city["y"])) for city in data["cities"]]
+            tickets = [
+                (ticket["cities"][0], ticket["cities"][1], ticket["points"]) for ticket in data["tickets"]
+            ]
+
+            connections = []
+            errors = []
+            for connection_data in data["connections"]:
+                city1_name, city2_name = connection_data["cities"]
+
+                cost = []
+                for card_color in connection_data["cost"]:
+                    try:
+                        cost.append(TrainCard[card_color.upper()])
+                    except KeyError:
+                        errors.append(f"{city1_name} - {city2_name}: unknown card color '{card_color}'")
+
+                connections.append((city1_name, city2_name, cost))
+
+        except (KeyError, IndexError, TypeError, ValueError) as error:
+            raise ValueError(f"Invalid map config {source_file}: {error!r}") from error
+
+        if errors:
+            raise ValueError(f"Invalid map config {source_file}:\n  " + "\n  ".join(errors))
+
+        return cls(cities, connections, tickets, source_file)
+
+    def validate(self):
+        """
+        Checks that connections and tickets use only cities of the map and that no connection joins a city with itself.
+        Raises ValueError listing all problems.
+        """
+
+        errors = []
+        city_names = {name for name, _ in self.cities}
+
+        for city1_name, city2_name, cost in self.connections:
+            route = f"{city1_name} - {city2_name}"
+
+            if city1_name == city2_name:
+                errors.append(f"{route}: connection of the city with itself")
+
+            for name in (city1_name, city2_name):
+                if name not in city_names:
+                    errors.append(f"{route}: unknown city {name}")
+
+            if not cost:
+                errors.append(f"{route}: empty cost")
+
+        for start_city, end_city, points in self.tickets:
+            for name in (start_city, end_city):
+                if name not in city_names:
+                    errors.append(f"Ticket {start_city} - {end_city}: unknown city {name}")
+
+        if errors:
+            raise ValueError(f"Invalid map config {self.source_file}:\n  " + "\n  ".join(errors))
+
+
+def get_cache_file(config_file: str):
+    """
+    Returns the path of the cache file of the config file.
+    """
+
+    folder, name = os.path.split(config_file)
+
+    return os.path.join(folder, "__mapcache__", f"{name}.v{CACHE_VERSION}.pickle")
+
+
+def read_cache(cache_file: str):
+    """
+    Returns the cache file content (dict with 'mtime', 'hash' and 'config'),
+    None if the cache is missing, broken or written by another version.
+    """
+
+    try:
+        with open(cache_file, "rb") as file:
+            cached = pickle.load(file)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+        return None
+
+    if not isinstance(cached, dict) or cached.get("version") != CACHE_VERSION:
+        return None
+
+    return cached
+
+
+def write_cache(cache_file: str, config: MapConfig, mtime: int, content_hash: str):
+    """
+    Writes the config to the cache file. Read-only folders are skipped, the cache is optional.
+    """
+
+    cached = {"version": CACHE_VERSION, "mtime": mtime, "hash": content_hash, "config": config}
+
+    try:
+        os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+
+        # Written to a temporary file first, so parallel workers never read a half-written cache
+        temporary_file = f"{cache_file}.{os.getpid()}.tmp"
+        with open(temporary_file, "wb") as file:
+            pickle.dump(cached, file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temporary_file, cache_file)
+
+    except OSError as error:
+        print(f"Warning: Could not write map cache {cache_file}: {error}")
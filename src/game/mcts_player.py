@@ -0,0 +1,298 @@
+import math
+import time
+from random import Random
+
+from actions import ClaimConnection, DrawDestinationTickets, DrawOpenCard, DrawTrainCard
+from game_state import CLAIM, DRAW_DECK, DRAW_OPEN, GameState
+from player import Player
+from policies import Policy
+
+
+class MCTSNode:
+    """
+    Node of the search tree. Children are keyed by the move without its payment (see move_key),
+    so the same claim is one node in all determinizations.
+    """
+
+    __slots__ = ("player", "children", "visits", "reward", "availability")
+
+    def __init__(self, player: int = None):
+        self.player = player  # Player who made the move leading to this node
+        self.children = {}  # Move key -> MCTSNode
+        self.visits = 0
+        self.reward = 0.0  # Sum of rewards of 'player'
+        self.availability = 0  # Number of iterations in which the move was legal
+
+    def ucb(self, exploration: float):
+        return self.reward / self.visits + exploration * math.sqrt(math.log(self.availability) / self.visits)
+
+
+class MCTSPlayer(Player, Policy):
+    """
+    Bot player choosing actions by Monte Carlo Tree Search over GameState, it is its own policy.
+    Hidden information is sampled (determinized) in every iteration: hands of the opponents,
+    the order of the train cards deck and the destination tickets of the opponents.
+    Statistics of the moves are shared by all determinizations (information set MCTS).
+
+    The budget is 'iterations' per move or 'time_limit' seconds if 'iterations' is None.
+    With 'workers' > 1 independent trees are searched in worker processes and their root statistics
+    are summed (root parallelism).
+    """
+
+    def __init__(
+        self,
+        name,
+        iterations: int = None,
+        time_limit: float = 1.0,
+        workers: int = 1,
+        exploration: float = 0.7,
+        playout_depth: int = 200,
+        rng: Random = None,
+        **kwargs,
+    ):
+        super().__init__(name, **kwargs)
+        Policy.__init__(self, rng)
+        self.policy = self
+        self.iterations = iterations
+        self.time_limit = time_limit
+        self.workers = workers
+        self.exploration = exploration
+        self.playout_depth = playout_depth  # Moves of a playout before the scores are taken as final
+        self.verbose = False  # Print search statistics
+
+        self.last_playouts = 0
+        self.last_playouts_per_second = 0.0
+        self.executor = None
+
+    def choose_action(self, game: "Game", actions: list = None):
+        """
+        Returns the action of the current player of the headless game (see Game.legal_actions).
+        """
+
+        actions = game.legal_actions() if actions is None else actions
+
+        if game.destination_tickets_to_choose:
+            return self.choose_destination_tickets(game, actions)
+
+        state = GameState.from_game(game, rng=Random(self.rng.random()))
+        unknown_tickets = [
+            (state.compiled.city_ids[ticket.start_city], state.compiled.city_ids[ticket.end_city], ticket.points)
+            for i, player in enumerate(game.players)
+            if i != state.current_player
+            for ticket in player.destination_tickets
+        ]
+        unknown_tickets.extend(
+            (state.compiled.city_ids[ticket.start_city], state.compiled.city_ids[ticket.end_city], ticket.points)
+            for ticket in game.destination_tickets_deck.cards
+        )
+
+        start = time.perf_counter()
+        statistics, playouts = self.search(state, unknown_tickets)
+        elapsed = time.perf_counter() - start
+
+        self.last_playouts = playouts
+        self.last_playouts_per_second = playouts / elapsed if elapsed else 0.0
+        if self.verbose:
+            print(f"{self.name}: {playouts} playouts in {elapsed:.2f} s ({self.last_playouts_per_second:.0f} playouts/s)")
+
+        if not statistics:
+            # Only destination tickets can be drawn
+            return DrawDestinationTickets() if DrawDestinationTickets() in actions else actions[0]
+
+        key = max(statistics, key=lambda key: statistics[key][0])
+
+        if key[0] == CLAIM:
+            return ClaimConnection(game.map.connections[key[1]])
+        elif key[0] == DRAW_DECK:
+            return DrawTrainCard()
+        elif key[0] == DRAW_OPEN:
+            return DrawOpenCard(key[1])
+
+    def search(self, state: GameState, unknown_tickets: list[tuple[int, int, int]]):
+        """
+        Returns (move key -> (visits, reward) of the root children, number of playouts).
+        """
+
+        if self.workers <= 1:
+            return search_tree(
+                state, unknown_tickets, self.iterations, self.time_limit, self.exploration, self.playout_depth, self.rng.random()
+            )
+
+        if self.executor is None:
+            # Imported here, single process bots do not need it
+            from concurrent.futures import ProcessPoolExecutor
+
+            self.executor = ProcessPoolExecutor(self.workers)
+
+        iterations = None if self.iterations is None else -(-self.iterations // self.workers)
+        futures = [
+            self.executor.submit(
+                search_tree,
+                state,
+                unknown_tickets,
+                iterations,
+                self.time_limit,
+                self.exploration,
+                self.playout_depth,
+                self.rng.random(),
+            )
+            for _ in range(self.workers)
+        ]
+
+        statistics = {}
+        playouts = 0
+        for future in futures:
+            worker_statistics, worker_playouts = future.result()
+            playouts += worker_playouts
+
+            for key, (visits, reward) in worker_statistics.items():
+                total_visits, total_reward = statistics.get(key, (0, 0.0))
+                statistics[key] = (total_visits + visits, total_reward + reward)
+
+        return statistics, playouts
+
+    def close(self):
+        """
+        Stops the worker processes.
+        """
+
+        if self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
+
+
+def move_key(move: tuple):
+    return move[:2]
+
+
+def determinize(state: GameState, player: int, unknown_tickets: list[tuple[int, int, int]], rng: Random):
+    """
+    Returns a copy of the state with the information hidden from the player sampled:
+    cards of the opponents and the train cards deck are dealt again, opponents get random unknown tickets.
+    """
+
+    state = state.copy()
+    state.rng = rng
+
+    pool = state.train_deck[:]
+    for opponent, hand in enumerate(state.hands):
+        if opponent != player:
+            for value, count in enumerate(hand):
+                pool.extend([value] * count)
+    rng.shuffle(pool)
+
+    for opponent, hand in enumerate(state.hands):
+        if opponent == player:
+            continue
+
+        size = sum(hand)
+        state.hands[opponent] = hand = [0] * len(hand)
+        for _ in range(size):
+            hand[pool.pop()] += 1
+
+    state.train_deck = pool
+
+    if unknown_tickets:
+        state.tickets = state.tickets[:]
+        tickets = rng.sample(unknown_tickets, len(unknown_tickets))
+
+        for opponent in range(state.num_players):
+            if opponent == player:
+                continue
+
+            count = len(state.open_tickets[opponent])
+            state.open_tickets[opponent] = list(range(len(state.tickets), len(state.tickets) + count))
+            state.tickets.extend(tickets.pop() for _ in range(count))
+
+    return state
+
+
+def rewards(state: GameState):
+    """
+    Returns reward of every player: 1 for the win, shared in a tie.
+    """
+
+    scores = state.final_scores()
+    best = max(scores)
+    winners = scores.count(best)
+
+    return [1.0 / winners if score == best else 0.0 for score in scores]
+
+
+def playout_move(state: GameState, rng: Random):
+    """
+    Random move preferring claims, random card draws alone rarely end the game.
+    """
+
+    moves = state.legal_moves()
+    claims = [move for move in moves if move[0] == CLAIM]
+
+    return rng.choice(claims or moves)
+
+
+def search_tree(
+    root_state: GameState,
+    unknown_tickets: list[tuple[int, int, int]],
+    iterations: int,
+    time_limit: float,
+    exploration: float,
+    playout_depth: int,
+    seed: float,
+):
+    """
+    Searches one tree from the root state, run in a worker process with root parallelism.
+    Returns (move key -> (visits, reward) of the root children, number of playouts).
+    """
+
+    rng = Random(seed)
+    root = MCTSNode()
+    player = root_state.current_player
+    deadline = time.perf_counter() + time_limit
+    playouts = 0
+
+    while playouts < iterations if iterations is not None else time.perf_counter() < deadline:
+        state = determinize(root_state, player, unknown_tickets, rng)
+        node = root
+        path = [root]
+
+        # Selection and expansion
+        while not state.game_over:
+            moves = {move_key(move): move for move in state.legal_moves()}
+            untried = []
+            for key in moves:
+                child = node.children.get(key)
+                if child is None:
+                    untried.append(key)
+                else:
+                    child.availability += 1
+
+            if untried:
+                key = rng.choice(untried)
+                node.children[key] = child = MCTSNode(state.current_player)
+                child.availability = 1
+                state.apply(moves[key])
+                path.append(child)
+                break
+
+            key = max(moves, key=lambda key: node.children[key].ucb(exploration))
+            node = node.children[key]
+            state.apply(moves[key])
+            path.append(node)
+
+        # Playout
+        for _ in range(playout_depth):
+            if state.game_over:
+                break
+            state.apply(playout_move(state, rng))
+
+        results = rewards(state)
+        for node in path:
+            node.visits += 1
+            if node.player is not None:
+                node.reward += results[node.player]
+
+        playouts += 1
+
+    statistics = {key: (child.visits, child.reward) for key, child in root.children.items()}
+
+    return statistics, playouts
@@ -0,0 +1,84 @@
+from cards import CARD_VECTOR_SIZE, COLOR_VALUES, TrainCard
+from compiled_map import CompiledMap
+
+LOCOMOTIVE = TrainCard.LOCOMOTIVE.value
+
+
+class PaymentPlanner:
+    """
+    Plans how to pay for routes with the cards of a hand (count vectors indexed by TrainCard value).
+    Rules: locomotive slots of a route need locomotives, colored slots take cards of the route color or locomotives,
+    grey slots take cards of any single color or locomotives.
+
+    Candidate payments of every route cost signature (see CompiledMap.route_signatures) are enumerated once,
+    as (locomotives, color value, color cards) sorted by the number of locomotives,
+    so planning a payment only scans a short list.
+    """
+
+    def __init__(self, compiled: CompiledMap):
+        self.compiled = compiled
+        self.candidates = {}  # Route signature -> list of (locomotives, color value, color cards)
+
+        for signature in set(compiled.route_signatures):
+            self.candidates[signature] = self.enumerate_candidates(*signature)
+
+    @staticmethod
+    def enumerate_candidates(color: int, count: int, locomotives: int):
+        """
+        Returns all valid payments of the route signature as (locomotives, color value, color cards),
+        the ones with fewer locomotives first.
+        """
+
+        if not count:
+            return [(locomotives, 0, 0)]
+
+        colors = COLOR_VALUES if color == TrainCard.GREY.value else [color]
+
+        candidates = [
+            (locomotives + substituted, value, count - substituted)
+            for value in colors
+            for substituted in range(count + 1)
+        ]
+        candidates.sort()
+
+        return candidates
+
+    def best_payment(self, hand: list[int], route_id: int):
+        """
+        Returns the payment (count vector) of the route preserving the most valuable hand,
+        None if the hand cannot pay it.
+        Locomotives are wild, so the payment with the fewest locomotives is chosen first.
+        Among them the one keeping the biggest sets of colored cards (highest sum of squared counts) wins,
+        e.g. a grey route is paid with the color having just enough cards.
+        """
+
+        best = None
+        best_loss = None
+
+        for locomotives, color, color_cards in self.candidates[self.compiled.route_signatures[route_id]]:
+            if best is not None and locomotives > best[0]:
+                break
+
+            if hand[LOCOMOTIVE] < locomotives or hand[color] < color_cards:
+                continue
+
+            # Decrease of the sum of squared color counts
+            loss = hand[color] ** 2 - (hand[color] - color_cards) ** 2 if color_cards else 0
+
+            if best is None or loss < best_loss:
+                best = (locomotives, color, color_cards)
+                best_loss = loss
+
+        return None if best is None else to_vector(*best)
+
+
+def to_vector(locomotives: int, color: int, color_cards: int):
+    """
+    Returns the payment as a count vector (tuple) indexed by TrainCard value.
+    """
+
+    payment = [0] * CARD_VECTOR_SIZE
+    payment[LOCOMOTIVE] = locomotives
+    payment[color] += color_cards
+
+    return tuple(payment)
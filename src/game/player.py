@@ -1,68 +1,64 @@
 from cards import TrainCard
 from cards import DestinationTicketCard
+from cards import Hand
 from map import CityConnection
+from disjoint_set import DisjointSet
+from longest_route import LongestRouteSolver
 
 
 
 class Player:
-    def __init__(self, name, trains=45, train_cards: list[TrainCard]=[], destination_tickets: list[DestinationTicketCard]=[]):
+    def __init__(self, name, trains=45, train_cards: list[TrainCard]=[], destination_tickets: list[DestinationTicketCard]=[], policy: "Policy" = None):
         self.name = name
+        self.policy = policy  # Chooses actions of a bot (see policies.Policy), None for a human player
         self.trains = trains
-        self.train_cards = train_cards
+        self.train_cards = Hand(train_cards)  # Count vector of train cards, iterating gives the list of cards
         self.destination_tickets = []
         self.accomplished_destination_tickets = []
         self.cities_connections = []
         self.score = 0
 
-    def get_city(self, city_name):
+        self.cities = {}  # Name -> city reached by player's connections
+        self.connected_cities = DisjointSet()  # Cities connected by player's connections, by name
+        self.longest_route_solver = LongestRouteSolver()
+
+    def add_connection(self, conn: CityConnection):
         """
-        Returns the city object with the given name.
+        Adds the claimed connection to the player's network.
         """
 
-        for conn in self.cities_connections:
-            for city in conn.cities:
-                if city.name == city_name:
-                    return city
-        return None
-    
+        self.cities_connections.append(conn)
 
+        city1, city2 = conn.cities
+        self.cities[city1.name] = city1
+        self.cities[city2.name] = city2
+        self.connected_cities.union(city1.name, city2.name)
+        self.longest_route_solver.add_connection(conn)
 
-    def get_longest_route(self):
+    def are_cities_connected(self, city1_name: str, city2_name: str):
         """
-        Returns the longest route for the player.
-        The longest route is defined as the route with the most connections.
+        Checks if player's connections join both cities.
         """
-        
-
-
-
-        player_cities = set(conn for conn in self.cities_connections)
-
-        def dfs(city, visited, length):
-            nonlocal max_length
-
-            max_length = max(max_length, length)
 
-            
-            for conn in city.get_all_connections_between_cities():
-                
-                neighbour_city = conn.cities[1] if conn.cities[0] == city else conn.cities[0]
+        return self.connected_cities.connected(city1_name, city2_name)
 
+    def get_city(self, city_name):
+        """
+        Returns the city object with the given name.
+        """
 
-                if neighbour_city not in visited:
-                    visited.add(neighbour_city)
-                    dfs(neighbour_city, visited, length + len(conn.cost))
-                    visited.remove(neighbour_city)
-
-        max_length = 0
+        return self.cities.get(city_name)
+    
 
-        for city in player_cities:
-            visited = (city)
-            dfs(city, visited, 0)
-        
-        return max_length
 
+    def get_longest_route(self):
+        """
+        Returns the longest route for the player.
+        The longest route is the number of trains on the longest continuous path,
+        every connection can be used only once.
+        """
 
+        return self.longest_route_solver.longest()
 
     def __str__(self):
         train_cards_str = ", ".join(card.name for card in self.train_cards)
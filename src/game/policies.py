@@ -0,0 +1,287 @@
+from random import Random
+
+from actions import ClaimConnection, DrawDestinationTickets, DrawOpenCard, DrawTrainCard, KeepDestinationTickets
+from cards import COLOR_VALUES, TrainCard
+from shortest_paths import ShortestPaths
+from ticket_estimator import TicketEstimator
+
+
+class Policy:
+    """
+    Chooses the actions of a bot player.
+    Game.play_turn consults the policy of a player (Player.policy) instead of the GUI or terminal input,
+    simulations call it directly with the legal actions of the headless game.
+    """
+
+    def __init__(self, rng: Random = None):
+        self.rng = rng or Random()
+
+        self.game = None  # Game of the shortest paths
+        self.shortest_paths = None
+        self.route_owners = []  # Route id -> owner when the shortest paths were updated
+        self.ticket_estimator = None  # Created by the policies estimating offered tickets
+
+    def update_shortest_paths(self, game: "Game"):
+        """
+        Returns the shortest paths of the current player (the policy plays one seat),
+        with the routes claimed since the last call applied.
+        """
+
+        if self.game is not game:
+            self.game = game
+            self.shortest_paths = ShortestPaths(game.map.compiled)
+            self.route_owners = [None] * len(game.map.connections)
+
+        player = game.players[game.current_player_index]
+
+        for conn in game.map.connections:
+            if conn.claimed_by is not self.route_owners[conn.id]:
+                self.route_owners[conn.id] = conn.claimed_by
+
+                if conn.claimed_by is player:
+                    self.shortest_paths.add_own_route(conn.id)
+                else:
+                    self.shortest_paths.remove_route(conn.id)
+
+        return self.shortest_paths
+
+    def choose_action(self, game: "Game", actions: list):
+        """
+        Returns one of the legal actions of the current player (see Game.legal_actions).
+        """
+
+        raise NotImplementedError
+
+    def choose_destination_tickets(self, game: "Game", actions: list[KeepDestinationTickets]):
+        """
+        Keeps the fewest tickets allowed, the ones needing the fewest trains.
+        """
+
+        compiled = game.map.compiled
+        shortest_paths = self.update_shortest_paths(game)
+        tickets = game.destination_tickets_to_choose
+        distances = [
+            shortest_paths.distance(compiled.city_ids[ticket.start_city], compiled.city_ids[ticket.end_city])
+            for ticket in tickets
+        ]
+        fewest = min(len(action.indices) for action in actions)
+
+        return min(
+            (action for action in actions if len(action.indices) == fewest),
+            key=lambda action: sum(distances[i] for i in action.indices),
+        )
+
+    def draw_card_action(self, game: "Game", actions: list, wanted_colors: set[TrainCard]):
+        """
+        Returns the action drawing an open card of a wanted color, otherwise the card from the deck.
+        Returns None if no card can be drawn.
+        """
+
+        draws = [action for action in actions if isinstance(action, (DrawOpenCard, DrawTrainCard))]
+
+        for action in draws:
+            if isinstance(action, DrawOpenCard) and game.open_cards_deck.cards[action.index] in wanted_colors:
+                return action
+
+        if DrawTrainCard() in draws:
+            return DrawTrainCard()
+
+        return draws[0] if draws else None
+
+
+class RandomPolicy(Policy):
+    """
+    Chooses a random legal action.
+    """
+
+    def choose_action(self, game: "Game", actions: list):
+        return self.rng.choice(actions)
+
+
+class GreedyPointsPolicy(Policy):
+    """
+    Claims the route giving the most points, otherwise draws cards of the color it has the most of.
+    Short routes give few points per train, so they are claimed only with a full hand.
+    """
+
+    min_claim_length = 3
+    max_hand_size = 10
+
+    def choose_action(self, game: "Game", actions: list):
+        if game.destination_tickets_to_choose:
+            return self.choose_destination_tickets(game, actions)
+
+        return self.greedy_action(game, actions)
+
+    def greedy_action(self, game: "Game", actions: list):
+        player = game.players[game.current_player_index]
+        claims = [action for action in actions if isinstance(action, ClaimConnection)]
+        draw = self.draw_card_action(game, actions, self.most_held_colors(game))
+
+        if claims:
+            best_claim = max(claims, key=lambda action: len(action.connection.cost))
+            if (
+                len(best_claim.connection.cost) >= self.min_claim_length
+                or len(player.train_cards) >= self.max_hand_size
+                or draw is None
+            ):
+                return best_claim
+
+        return draw or self.rng.choice(actions)
+
+    def most_held_colors(self, game: "Game"):
+        """
+        Returns set of the color the current player has the most cards of and locomotives.
+        """
+
+        counts = game.players[game.current_player_index].train_cards.counts
+        color = max(COLOR_VALUES, key=lambda value: counts[value])
+
+        return {TrainCard(color), TrainCard.LOCOMOTIVE}
+
+
+class TicketShortestPathPolicy(GreedyPointsPolicy):
+    """
+    Builds the shortest paths of its destination tickets: claims the route lying on the shortest paths
+    of the most ticket points and draws cards of the colors of such routes.
+    With all tickets completed it draws new ones while it has enough trains,
+    when the paths are blocked or the hand is full it plays greedily.
+    Offered tickets are kept if they are likely to be completed (see TicketEstimator).
+    """
+
+    min_trains_for_tickets = 15
+    min_ticket_probability = 0.5
+    estimator_samples = 24
+
+    def choose_destination_tickets(self, game: "Game", actions: list[KeepDestinationTickets]):
+        """
+        Keeps the tickets completed with at least 'min_ticket_probability',
+        at least the fewest allowed ones with the most expected points.
+        """
+
+        estimator = self.ticket_estimator
+        if estimator is None or estimator.compiled is not game.map.compiled:
+            # No time budget, seeded games must not depend on the speed of the machine
+            estimator = self.ticket_estimator = TicketEstimator(
+                game.map.compiled, samples=self.estimator_samples, time_budget=None, rng=self.rng
+            )
+
+        tickets = game.destination_tickets_to_choose
+        estimates = estimator.estimate(game, game.players[game.current_player_index], tickets)
+        ranked = sorted(range(len(tickets)), key=lambda i: estimates[i][1], reverse=True)
+
+        kept = [i for i in ranked if estimates[i][0] >= self.min_ticket_probability]
+        fewest = min(len(action.indices) for action in actions)
+        if len(kept) < fewest:
+            kept = ranked[:fewest]
+
+        return KeepDestinationTickets(tuple(sorted(kept)))
+
+    def choose_action(self, game: "Game", actions: list):
+        if game.destination_tickets_to_choose:
+            return self.choose_destination_tickets(game, actions)
+
+        player = game.players[game.current_player_index]
+        routes = self.ticket_routes(game)
+
+        useful_claims = [
+            action for action in actions if isinstance(action, ClaimConnection) and action.connection.id in routes
+        ]
+        if useful_claims:
+            return max(useful_claims, key=lambda action: (routes[action.connection.id], len(action.connection.cost)))
+
+        if (
+            not player.destination_tickets
+            and player.trains >= self.min_trains_for_tickets
+            and DrawDestinationTickets() in actions
+        ):
+            return DrawDestinationTickets()
+
+        if not routes or len(player.train_cards) >= self.max_hand_size:
+            return self.greedy_action(game, actions)
+
+        return self.draw_card_action(game, actions, self.ticket_colors(game, routes)) or self.greedy_action(game, actions)
+
+    def ticket_routes(self, game: "Game"):
+        """
+        Returns dict of route id -> points of the tickets of the current player,
+        for the unclaimed routes on the shortest paths of the tickets still possible to complete.
+        """
+
+        compiled = game.map.compiled
+        shortest_paths = self.update_shortest_paths(game)
+        connections = game.map.connections
+        routes = {}
+
+        for ticket in game.players[game.current_player_index].destination_tickets:
+            path = shortest_paths.path(compiled.city_ids[ticket.start_city], compiled.city_ids[ticket.end_city])
+            if path is None:
+                continue
+
+            for route_id in path:
+                if connections[route_id].claimed_by is None:
+                    routes[route_id] = routes.get(route_id, 0) + ticket.points
+
+        return routes
+
+    def ticket_colors(self, game: "Game", routes: dict[int, int]):
+        """
+        Returns set of the card colors needed for the routes, grey routes take the most held color.
+        """
+
+        colors = {TrainCard.LOCOMOTIVE}
+
+        for route_id in routes:
+            for card in game.map.connections[route_id].cost:
+                if card == TrainCard.GREY:
+                    colors |= self.most_held_colors(game)
+                else:
+                    colors.add(card)
+
+        return colors
+
+
+class RouteBlockerPolicy(TicketShortestPathPolicy):
+    """
+    Plays for its tickets, but first claims the routes joining two separate parts of an opponent's network,
+    which the opponent most likely needs for a ticket.
+    """
+
+    def choose_action(self, game: "Game", actions: list):
+        if game.destination_tickets_to_choose:
+            return self.choose_destination_tickets(game, actions)
+
+        claims = [action for action in actions if isinstance(action, ClaimConnection)]
+        scores = {action: self.blocking_score(game, action.connection) for action in claims}
+        blocking_claims = [action for action in claims if scores[action]]
+
+        if blocking_claims:
+            return max(blocking_claims, key=lambda action: (scores[action], len(action.connection.cost)))
+
+        return super().choose_action(game, actions)
+
+    def blocking_score(self, game: "Game", conn: "CityConnection"):
+        """
+        Returns the number of opponents whose separate network parts the connection joins.
+        """
+
+        city1, city2 = (city.name for city in conn.cities)
+        player = game.players[game.current_player_index]
+
+        return sum(
+            1
+            for opponent in game.players
+            if opponent is not player
+            and city1 in opponent.cities
+            and city2 in opponent.cities
+            and not opponent.are_cities_connected(city1, city2)
+        )
+
+
+# Built-in policies: name -> class, created with the random generator of the game
+POLICIES = {
+    "random": RandomPolicy,
+    "greedy": GreedyPointsPolicy,
+    "tickets": TicketShortestPathPolicy,
+    "blocker": RouteBlockerPolicy,
+}
@@ -0,0 +1,199 @@
+import copy
+from bisect import bisect_right
+
+from actions import ClaimConnection, DrawDestinationTickets, DrawOpenCard, DrawTrainCard, KeepDestinationTickets
+from cards import DestinationTicketCard, DestinationTicketsDeck, OpenCardsDeck, TrainCard, TrainCardsDeck
+from events import (
+    DeckReshuffled,
+    EventLog,
+    GameEnded,
+    GameStarted,
+    OpenCardDrawn,
+    RouteClaimed,
+    TicketsDrawn,
+    TicketsKept,
+    TrainCardDrawn,
+)
+from game import Game
+from map import Map
+from map_config import DEFAULT_CONFIG_FILE
+from player import Player
+
+
+class Replayer:
+    """
+    Reconstructs a recorded game (see Game.record_events) at any turn.
+    The events are applied to a new headless Game through its actions, so the replay checks the log as well.
+    Every 'snapshot_interval' turns a copy of the game is kept, seeking replays at most that many turns
+    from the nearest snapshot before the wanted turn.
+    """
+
+    def __init__(self, event_log: EventLog, config_file: str = DEFAULT_CONFIG_FILE, snapshot_interval: int = 20):
+        self.events = list(event_log)
+        self.snapshot_interval = snapshot_interval
+
+        if not self.events or not isinstance(self.events[0], GameStarted):
+            raise ValueError("Event log does not start with GameStarted")
+
+        self.config_file = config_file
+        self.snapshots = []  # (turn number, index of the next event, game) sorted by turn
+        self.snapshot_turns = []
+
+        game = self.initial_game(self.events[0])
+        self.add_snapshot(game, 1)
+
+    def initial_game(self, started: GameStarted):
+        """
+        Returns the started game with the decks in the recorded order.
+        """
+
+        map = Map(config_file=self.config_file)
+        compiled = map.compiled
+        train_cards_deck = TrainCardsDeck()
+        # Open cards are drawn from the top of the deck when the open cards deck is created
+        train_cards_deck.cards.clear()
+        train_cards_deck.cards.extend(TrainCard(value) for value in started.train_deck)
+        train_cards_deck.cards.extend(TrainCard(value) for value in reversed(started.open_cards))
+        # Reshuffles happen at the same points of the replay, with the recorded seeds
+        train_cards_deck.reshuffle_seeds.extend(event.seed for event in self.events if isinstance(event, DeckReshuffled))
+
+        tickets = [
+            DestinationTicketCard(compiled.city_names[start], compiled.city_names[end], points)
+            for start, end, points in started.tickets_deck
+        ]
+
+        game = Game(
+            map=map,
+            train_cards_deck=train_cards_deck,
+            destination_tickets_deck=DestinationTicketsDeck(cards=tickets),
+            open_cards_deck=OpenCardsDeck(train_cards_deck),
+            current_player_index=started.first_player,
+            players=[Player(name=f"Player {i + 1}", train_cards=[]) for i in range(started.num_players)],
+        )
+        game.verbose = False
+        game.start(shuffle=False)
+
+        return game
+
+    def add_snapshot(self, game: Game, next_event: int):
+        self.snapshots.append((game.turn_number, next_event, self.copy_game(game)))
+        self.snapshot_turns.append(game.turn_number)
+
+    def copy_game(self, game: Game):
+        """
+        Returns a deep copy of the game, the compiled map graph and the payment planner never change and are shared.
+        """
+
+        shared = (game.map.compiled, game.payment_planner)
+        return copy.deepcopy(game, {id(value): value for value in shared})
+
+    @property
+    def num_turns(self):
+        """
+        Number of turns of the recorded game (initial ticket choices included).
+        """
+
+        return self.game_at(None).turn_number
+
+    def game_at(self, turn: int = None):
+        """
+        Returns a new game in the state before the given turn number was played (Game.turn_number == turn),
+        the final state if the turn is None or the game ended before it.
+        """
+
+        i = bisect_right(self.snapshot_turns, turn) - 1 if turn is not None else len(self.snapshots) - 1
+        snapshot_turn, position, game = self.snapshots[max(i, 0)]
+        game = self.copy_game(game)
+        last_snapshot_turn = self.snapshot_turns[-1]
+
+        while position < len(self.events) and (turn is None or game.turn_number < turn):
+            self.apply_event(game, self.events[position])
+            position += 1
+
+            if game.turn_number >= last_snapshot_turn + self.snapshot_interval and not game.cards_drawn_this_turn:
+                self.add_snapshot(game, position)
+                last_snapshot_turn = game.turn_number
+
+        return game
+
+    def apply_event(self, game: Game, event):
+        """
+        Applies the recorded event to the game.
+        Raises ValueError if the event does not match the state of the game.
+        """
+
+        match event:
+            case TrainCardDrawn(player=player, card=card):
+                self.check(game.current_player_index == player, event)
+                # Checked after the draw, the empty deck is reshuffled by it
+                hand = game.players[player].train_cards
+                count = hand.counts[card]
+                game.apply(DrawTrainCard())
+                self.check(hand.counts[card] == count + 1, event)
+
+            case OpenCardDrawn(index=index, card=card):
+                cards = game.open_cards_deck.cards
+                self.check(index < len(cards) and cards[index] is not None and cards[index].value == card, event)
+                game.apply(DrawOpenCard(index))
+
+            case TicketsDrawn(tickets=tickets):
+                # Tickets of the setup are offered by the game itself
+                if not game.destination_tickets_to_choose:
+                    game.apply(DrawDestinationTickets())
+                self.check(game.ticket_ids(game.destination_tickets_to_choose) == tickets, event)
+
+            case TicketsKept(indices=indices):
+                game.apply(KeepDestinationTickets(indices))
+
+            case RouteClaimed(player=player, route=route, cards=cards):
+                self.check(game.current_player_index == player, event)
+                hand = game.players[player].train_cards
+                before = list(hand.counts)
+                game.apply(ClaimConnection(game.map.connections[route]))
+                spent = [count - left for count, left in zip(before, hand.counts)]
+                self.check(spent == [cards.count(value) for value in range(len(spent))], event)
+
+            case DeckReshuffled():
+                # Done by the replayed action, see initial_game
+                pass
+
+            case GameEnded(scores=scores):
+                # Game cut off before its end (see simulate.run_game)
+                if not game.game_over:
+                    game.game_over = True
+                    game.finish_game()
+                self.check(tuple(player.score for player in game.players) == scores, event)
+
+            case _:
+                raise ValueError(f"Unexpected event: {event}")
+
+    def check(self, condition, event):
+        if not condition:
+            raise ValueError(f"Event log does not match the replayed game: {event}")
+
+
+def main():
+    import argparse
+
+    from events import read_logs
+
+    parser = argparse.ArgumentParser(description="Shows a recorded game at the given turn.")
+    parser.add_argument("events", help="Event logs file written by simulate.py --events")
+    parser.add_argument("--game", type=int, default=0, help="Index of the game in the file")
+    parser.add_argument("--turn", type=int, default=None, help="Turn number, the end of the game by default")
+    parser.add_argument("--config", default=DEFAULT_CONFIG_FILE, help="Map config file")
+    args = parser.parse_args()
+
+    with open(args.events, "rb") as file:
+        for i, event_log in enumerate(read_logs(file)):
+            if i == args.game:
+                break
+        else:
+            raise ValueError(f"There is no game {args.game} in {args.events}")
+
+    game = Replayer(event_log, config_file=args.config).game_at(args.turn)
+    print(game)
+
+
+if __name__ == "__main__":
+    main()
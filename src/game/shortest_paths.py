@@ -0,0 +1,243 @@
+from array import array
+from heapq import heappop, heappush
+
+UNREACHABLE = 0xFFFF  # Distance between cities without any path
+NO_ROUTE = 0xFFFF  # Next route of a city to itself or to an unreachable city
+
+
+def dijkstra(compiled: "CompiledMap", lengths: list, target: int):
+    """
+    Returns (distances, next routes) of all cities to the target city,
+    the next route is the first route of the shortest path from the city to the target.
+    'lengths' are the route lengths (route id -> length), routes with None length are skipped.
+    """
+
+    distances = [UNREACHABLE] * compiled.num_cities
+    next_routes = [NO_ROUTE] * compiled.num_cities
+    distances[target] = 0
+    queue = [(0, target)]
+
+    while queue:
+        distance, city = heappop(queue)
+        if distance > distances[city]:
+            continue
+
+        for position in range(compiled.adjacency_offsets[city], compiled.adjacency_offsets[city + 1]):
+            route_id = compiled.adjacency_routes[position]
+            if lengths[route_id] is None:
+                continue
+
+            neighbour = compiled.adjacency_cities[position]
+            new_distance = distance + lengths[route_id]
+
+            if new_distance < distances[neighbour]:
+                distances[neighbour] = new_distance
+                next_routes[neighbour] = route_id
+                heappush(queue, (new_distance, neighbour))
+
+    return distances, next_routes
+
+
+def all_pairs_shortest_paths(compiled: "CompiledMap"):
+    """
+    Returns (distances, next routes) between all pairs of cities, weighted by route lengths (number of trains).
+    Both are flat arrays: the value for the path from city 'a' to city 'b' is at a * num_cities + b.
+    Computed by Dijkstra to every city, which is faster than Floyd-Warshall on the sparse map graph.
+    """
+
+    n = compiled.num_cities
+    distances = array("H", [UNREACHABLE]) * (n * n)
+    next_routes = array("H", [NO_ROUTE]) * (n * n)
+    lengths = list(compiled.route_lengths)
+
+    for target in range(n):
+        target_distances, target_next_routes = dijkstra(compiled, lengths, target)
+        distances[target::n] = array("H", target_distances)
+        next_routes[target::n] = array("H", target_next_routes)
+
+    return distances, next_routes
+
+
+class ShortestPaths:
+    """
+    Shortest paths between all pairs of cities as seen by one player, queries take O(1).
+    Starts from the tables precomputed in the compiled map (CompiledMap.distances and next_routes)
+    and is updated incrementally as routes get claimed: routes of the opponents are removed,
+    the player's own routes cost nothing, so distances are the numbers of trains still needed.
+    """
+
+    def __init__(self, compiled: "CompiledMap"):
+        self.compiled = compiled
+        self.num_cities = compiled.num_cities
+        self.distances = array("H", compiled.distances)
+        self.next_routes = array("H", compiled.next_routes)
+        self.lengths = list(compiled.route_lengths)  # Route id -> length, None for removed routes
+
+    def distance(self, city1: int, city2: int):
+        return self.distances[city1 * self.num_cities + city2]
+
+    def path(self, city1: int, city2: int):
+        """
+        Returns list of route ids of a shortest path between both cities, None if there is no path.
+        """
+
+        if self.distance(city1, city2) == UNREACHABLE:
+            return None
+
+        compiled = self.compiled
+        routes = []
+
+        while city1 != city2:
+            route_id = self.next_routes[city1 * self.num_cities + city2]
+            routes.append(route_id)
+            route_city1, route_city2 = compiled.route_cities(route_id)
+            city1 = route_city2 if city1 == route_city1 else route_city1
+
+        return routes
+
+    def remove_route(self, route_id: int):
+        """
+        Removes the route claimed by an opponent.
+        Only the paths to the targets whose shortest path tree used the route are repaired.
+        """
+
+        if self.lengths[route_id] is None:
+            return
+
+        self.lengths[route_id] = None
+
+        n = self.num_cities
+        route_city1, route_city2 = self.compiled.route_cities(route_id)
+
+        repaired = []
+        for target in range(n):
+            if self.next_routes[route_city1 * n + target] == route_id:
+                self.repair_target(target, route_city1)
+                repaired.append(target)
+            elif self.next_routes[route_city2 * n + target] == route_id:
+                self.repair_target(target, route_city2)
+                repaired.append(target)
+
+        # The graph is undirected, distances from the targets are the same as to them.
+        # Copied at the end, repairing reads only the distances to its target.
+        for target in repaired:
+            self.distances[target * n : (target + 1) * n] = self.distances[target::n]
+
+    def repair_target(self, target: int, child: int):
+        """
+        Updates the paths to the target (the distances column) after the first route of the child's path was removed.
+        Only the cities of the child's subtree of the shortest path tree lost their paths,
+        they get the best path leaving the subtree and then Dijkstra runs inside the subtree.
+        """
+
+        compiled = self.compiled
+        n = self.num_cities
+        distances = self.distances
+        next_routes = self.next_routes
+        lengths = self.lengths
+        child_distance = distances[child * n + target]
+
+        # Another route of the same total length leaves the subtree (its cities are not closer than the child),
+        # distances do not change
+        for position in range(compiled.adjacency_offsets[child], compiled.adjacency_offsets[child + 1]):
+            route_id = compiled.adjacency_routes[position]
+            neighbour_distance = distances[compiled.adjacency_cities[position] * n + target]
+
+            if (
+                lengths[route_id] is not None
+                and neighbour_distance < child_distance
+                and neighbour_distance + lengths[route_id] == child_distance
+            ):
+                next_routes[child * n + target] = route_id
+                return
+
+        # Cities with a shortest path through the child, a superset of the child's subtree.
+        # Other cities have a path avoiding the removed route, their distances do not change.
+        subtree = [
+            city
+            for city, (to_child, to_target) in enumerate(zip(distances[child::n], distances[target::n]))
+            if to_child + child_distance == to_target
+        ]
+        in_subtree = set(subtree)
+
+        new_distances = {}
+        new_next_routes = {}
+        queue = []
+
+        for city in subtree:
+            best = UNREACHABLE
+            best_route = NO_ROUTE
+
+            for position in range(compiled.adjacency_offsets[city], compiled.adjacency_offsets[city + 1]):
+                route_id = compiled.adjacency_routes[position]
+                neighbour = compiled.adjacency_cities[position]
+                if lengths[route_id] is None or neighbour in in_subtree:
+                    continue
+
+                distance = lengths[route_id] + distances[neighbour * n + target]
+                if distance < best:
+                    best = distance
+                    best_route = route_id
+
+            new_distances[city] = best
+            new_next_routes[city] = best_route
+            if best != UNREACHABLE:
+                heappush(queue, (best, city))
+
+        while queue:
+            distance, city = heappop(queue)
+            if distance > new_distances[city]:
+                continue
+
+            for position in range(compiled.adjacency_offsets[city], compiled.adjacency_offsets[city + 1]):
+                route_id = compiled.adjacency_routes[position]
+                neighbour = compiled.adjacency_cities[position]
+                if lengths[route_id] is None or neighbour not in in_subtree:
+                    continue
+
+                new_distance = distance + lengths[route_id]
+                if new_distance < new_distances[neighbour]:
+                    new_distances[neighbour] = new_distance
+                    new_next_routes[neighbour] = route_id
+                    heappush(queue, (new_distance, neighbour))
+
+        for city in subtree:
+            distances[city * n + target] = new_distances[city]
+            next_routes[city * n + target] = new_next_routes[city]
+
+    def add_own_route(self, route_id: int):
+        """
+        Sets the length of the route claimed by the player to 0.
+        Paths can only get shorter: a path from 'a' to 'b' entering the route at 'start' and leaving at 'end'
+        is shorter only if 'a' is closer to 'start' than to 'end' and 'b' closer to 'end' than to 'start',
+        only such pairs are checked.
+        """
+
+        if not self.lengths[route_id]:
+            return
+
+        self.lengths[route_id] = 0
+
+        n = self.num_cities
+        distances = self.distances
+        next_routes = self.next_routes
+        route_city1, route_city2 = self.compiled.route_cities(route_id)
+
+        # Distances to both ends before the update
+        to_city1 = distances[route_city1::n].tolist()
+        to_city2 = distances[route_city2::n].tolist()
+
+        for start, to_start, to_end in ((route_city1, to_city1, to_city2), (route_city2, to_city2, to_city1)):
+            sources = [city for city in range(n) if to_start[city] < to_end[city]]
+            targets = [city for city in range(n) if to_end[city] < to_start[city]]
+
+            for city1 in sources:
+                row = city1 * n
+                start_distance = to_start[city1]
+                first_route = route_id if city1 == start else next_routes[row + start]
+
+                for city2 in targets:
+                    distance = start_distance + to_end[city2]
+                    if distance < distances[row + city2]:
+                        distances[row + city2] = distance
+                        next_routes[row + city2] = first_route
@@ -0,0 +1,229 @@
+import random
+import time
+
+from map import Map
+from map_config import DEFAULT_CONFIG_FILE
+from cards import TrainCardsDeck, DestinationTicketsDeck, OpenCardsDeck
+from events import EventLog
+from player import Player
+from game import Game
+from mcts_player import MCTSPlayer
+from policies import POLICIES as BUILT_IN_POLICIES
+
+MCTS_ITERATIONS = 100  # Iterations per move of the "mcts" policy
+
+
+def mcts_policy(rng: random.Random):
+    """
+    Creates the Monte Carlo Tree Search bot with MCTS_ITERATIONS iterations per move.
+    """
+
+    return MCTSPlayer("MCTS", iterations=MCTS_ITERATIONS, rng=rng)
+
+
+# Bot policies available for simulations: name -> function(rng) creating the policy
+POLICIES = {**BUILT_IN_POLICIES, "mcts": mcts_policy}
+
+RESULT_FIELDS = ["seed", "winner", "scores", "turns", "tickets_completed", "trains_left", "policies", "truncated"]
+
+
+def create_game(num_players: int, seed: int = None, config_file: str = DEFAULT_CONFIG_FILE):
+    """
+    Creates a new headless game with the given number of players.
+    All decks shuffle with the game random generator, so the same seed gives the same game.
+    """
+
+    rng = random.Random(seed)
+    train_cards_deck = TrainCardsDeck(rng=rng)
+
+    game = Game(
+        map=Map(config_file=config_file),
+        train_cards_deck=train_cards_deck,
+        destination_tickets_deck=DestinationTicketsDeck(cards=[], config_file=config_file, rng=rng),
+        open_cards_deck=OpenCardsDeck(train_cards_deck, rng=rng),
+        current_player_index=0,
+        players=[Player(name=f"Player {i + 1}", train_cards=[]) for i in range(num_players)],
+        rng=rng,
+    )
+    game.verbose = False
+
+    return game
+
+
+def run_game(
+    seed: int,
+    policy_names: list[str],
+    config_file: str = DEFAULT_CONFIG_FILE,
+    max_turns: int = 1000,
+    record_events: bool = False,
+):
+    """
+    Plays one game with bots using the given policies (one per player).
+    Returns the dict with the game result, with the encoded EventLog of the game under "events" if recorded.
+    """
+
+    game = create_game(len(policy_names), seed, config_file)
+    if record_events:
+        game.record_events(EventLog())
+
+    # Policies have their own generator, so they do not change the deck order
+    rng = random.Random(seed)
+    for player, name in zip(game.players, policy_names):
+        player.policy = POLICIES[name](rng)
+
+    game.start()
+
+    while not game.game_over and game.turn_number < max_turns:
+        actions = game.legal_actions()
+        player = game.players[game.current_player_index]
+        game.apply(player.policy.choose_action(game, actions))
+
+    # Game cut off at 'max_turns' is scored as if it ended now
+    truncated = not game.game_over
+    if truncated:
+        game.game_over = True
+        game.finish_game()
+
+    scores = [player.score for player in game.players]
+    winner = game.players[scores.index(max(scores))]
+
+    result = {
+        "seed": seed,
+        "winner": winner.name,
+        "scores": scores,
+        "turns": game.turn_number,
+        "tickets_completed": [len(player.accomplished_destination_tickets) for player in game.players],
+        "trains_left": [player.trains for player in game.players],
+        "policies": policy_names,
+        "truncated": truncated,
+    }
+
+    if record_events:
+        result["events"] = bytes(game.event_log)
+
+    return result
+
+
+def run_games(
+    seeds: list[int], policy_names: list[str], config_file: str = DEFAULT_CONFIG_FILE, record_events: bool = False
+):
+    """
+    Plays games for all seeds in one worker process.
+    """
+
+    return [run_game(seed, policy_names, config_file, record_events=record_events) for seed in seeds]
+
+
+def simulate(
+    num_games: int,
+    policy_names: list[str],
+    output_file: str,
+    first_seed: int = 0,
+    workers: int = None,
+    chunk_size: int = 50,
+    config_file: str = DEFAULT_CONFIG_FILE,
+    events_file: str = None,
+):
+    """
+    Runs 'num_games' seeded games across worker processes and streams results to 'output_file'
+    (CSV if the file name ends with .csv, JSON lines otherwise).
+    With 'events_file' the event logs of the games are written to it in the order of the results (see events.write_logs).
+    Returns the number of simulated games per second.
+    """
+
+    # Imported here, worker processes only need run_games
+    import csv
+    import json
+    from concurrent.futures import ProcessPoolExecutor
+    from contextlib import nullcontext
+
+    from events import write_logs
+
+    for name in policy_names:
+        if name not in POLICIES:
+            raise ValueError(f"Unknown policy '{name}', available: {', '.join(POLICIES)}")
+
+    seeds = list(range(first_seed, first_seed + num_games))
+    chunks = [seeds[i : i + chunk_size] for i in range(0, len(seeds), chunk_size)]
+
+    start = time.perf_counter()
+    games_done = 0
+
+    with (
+        open(output_file, "w", newline="") as file,
+        open(events_file, "wb") if events_file else nullcontext() as events,
+        ProcessPoolExecutor(workers) as executor,
+    ):
+        as_csv = output_file.endswith(".csv")
+        if as_csv:
+            writer = csv.DictWriter(file, fieldnames=RESULT_FIELDS)
+            writer.writeheader()
+
+        results = executor.map(
+            run_games,
+            chunks,
+            [policy_names] * len(chunks),
+            [config_file] * len(chunks),
+            [events_file is not None] * len(chunks),
+        )
+
+        for chunk_results in results:
+            if events is not None:
+                write_logs(events, [result.pop("events") for result in chunk_results])
+
+            for result in chunk_results:
+                if as_csv:
+                    # Lists (one value per player) are stored as JSON in a single column
+                    writer.writerow(
+                        {
+                            key: json.dumps(value) if isinstance(value, list) else value
+                            for key, value in result.items()
+                        }
+                    )
+                else:
+                    file.write(json.dumps(result) + "\n")
+
+            games_done += len(chunk_results)
+            elapsed = time.perf_counter() - start
+            print(f"{games_done}/{num_games} games, {games_done / elapsed:.1f} games/s")
+
+    elapsed = time.perf_counter() - start
+    games_per_second = num_games / elapsed if elapsed else 0.0
+    print(f"Simulated {num_games} games in {elapsed:.2f} s ({games_per_second:.1f} games/s)")
+
+    return games_per_second
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Runs many bot games without GUI.")
+    parser.add_argument("--games", type=int, default=100, help="Number of games")
+    parser.add_argument(
+        "--policies",
+        nargs="+",
+        default=["random", "random"],
+        help=f"Policy of each player, available: {', '.join(POLICIES)}",
+    )
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the first game")
+    parser.add_argument("--workers", type=int, default=None, help="Number of worker processes")
+    parser.add_argument("--chunk-size", type=int, default=50, help="Games per worker task")
+    parser.add_argument("--config", default=DEFAULT_CONFIG_FILE, help="Map config file")
+    parser.add_argument("--output", default="results.jsonl", help="Output file (.jsonl or .csv)")
+    parser.add_argument("--events", default=None, help="Binary file for the event logs of the games (see replay.py)")
+    args = parser.parse_args()
+
+    simulate(
+        args.games,
+        args.policies,
+        args.output,
+        first_seed=args.seed,
+        workers=args.workers,
+        chunk_size=args.chunk_size,
+        config_file=args.config,
+        events_file=args.events,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+from geometry import is_point_in_polygon
+
+
+class SpatialIndex:
+    """
+    Uniform grid over the screen used for click hit-testing.
+    Every registered zone (city, card, deck, route segment) is stored in the cells its bounding box covers,
+    so a point query only tests the few zones from a single cell.
+    """
+
+    def __init__(self, cell_size: int = 32):
+        self.cell_size = cell_size
+        self.cells = {}  # (column, row) -> list of zones
+        self.zones_count = 0
+
+    def add_zone(self, kind: str, value, bounds: tuple[float, float, float, float], contains):
+        """
+        Registers a zone.
+        'bounds' - (min_x, min_y, max_x, max_y) bounding box of the zone
+        'contains' - function checking if the point lies inside the zone
+        """
+
+        # Insertion order decides priority of overlapping zones
+        zone = (self.zones_count, kind, value, contains)
+        self.zones_count += 1
+
+        min_x, min_y, max_x, max_y = bounds
+        for column in range(int(min_x // self.cell_size), int(max_x // self.cell_size) + 1):
+            for row in range(int(min_y // self.cell_size), int(max_y // self.cell_size) + 1):
+                self.cells.setdefault((column, row), []).append(zone)
+
+    def add_rect(self, kind: str, value, rect: tuple[float, float, float, float]):
+        """
+        Registers a rectangular zone given as (x, y, width, height).
+        """
+
+        x, y, width, height = rect
+
+        def contains(point):
+            return x <= point[0] < x + width and y <= point[1] < y + height
+
+        self.add_zone(kind, value, (x, y, x + width, y + height), contains)
+
+    def add_circle(self, kind: str, value, center: tuple[float, float], radius: float):
+        """
+        Registers a circular zone.
+        """
+
+        cx, cy = center
+
+        def contains(point):
+            return (point[0] - cx) ** 2 + (point[1] - cy) ** 2 <= radius**2
+
+        self.add_zone(kind, value, (cx - radius, cy - radius, cx + radius, cy + radius), contains)
+
+    def add_polygon(self, kind: str, value, polygon):
+        """
+        Registers a convex polygon zone, e.g. a route segment.
+        """
+
+        xs = [x for x, _ in polygon]
+        ys = [y for _, y in polygon]
+
+        def contains(point):
+            return is_point_in_polygon(point, polygon)
+
+        self.add_zone(kind, value, (min(xs), min(ys), max(xs), max(ys)), contains)
+
+    def query(self, point: tuple[float, float], kind: str = None):
+        """
+        Returns list of (kind, value) of all zones containing the point, in the registration order.
+        If 'kind' is given only zones of this kind are returned.
+        """
+
+        cell = (int(point[0] // self.cell_size), int(point[1] // self.cell_size))
+
+        hits = [
+            zone
+            for zone in self.cells.get(cell, [])
+            if (kind is None or zone[1] == kind) and zone[3](point)
+        ]
+        hits.sort(key=lambda zone: zone[0])
+
+        return [(zone_kind, value) for _, zone_kind, value, _ in hits]
+
+    def find(self, point: tuple[float, float], kind: str):
+        """
+        Returns value of the first zone of the given kind containing the point, None if there is no such zone.
+        """
+
+        hits = self.query(point, kind)
+
+        return hits[0][1] if hits else None
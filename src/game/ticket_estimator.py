@@ -0,0 +1,122 @@
+import time
+from heapq import heappop, heappush
+from random import Random
+
+TRAINS_PER_TURN = 1.1  # Average number of trains a player places per turn (simulated games)
+MAX_TAKEN_PROBABILITY = 0.95
+
+
+class TicketEstimator:
+    """
+    Estimates the probability that a player completes destination tickets, by Monte Carlo sampling.
+    Every sample is a random completion of the board: each unclaimed route is taken by an opponent
+    with the probability that the opponents' remaining trains cover it.
+    A ticket is completed in the sample if the cheapest path between its cities over the player's routes (free)
+    and the routes left to the player fits into the player's trains and can be built in the turns left:
+    one turn per claim plus one turn for every two missing cards.
+    Samples run until 'samples' is reached or the 'time_budget' (seconds) is spent,
+    with 'time_budget' None exactly 'samples' run, so the result depends only on the random generator.
+    """
+
+    def __init__(self, compiled: "CompiledMap", samples: int = 500, time_budget: float = 0.04, rng: Random = None):
+        self.compiled = compiled
+        self.samples = samples
+        self.time_budget = time_budget
+        self.rng = rng or Random()
+        self.last_samples = 0  # Samples used by the last estimate
+
+    def estimate(self, game: "Game", player: "Player", tickets: list["DestinationTicketCard"]):
+        """
+        Returns list of (completion probability, expected points) of the tickets for the player.
+        """
+
+        compiled = self.compiled
+        deadline = None if self.time_budget is None else time.perf_counter() + self.time_budget
+        rng = self.rng
+
+        # Turns left until the last round ends, the game ends soon after somebody has 2 or fewer trains
+        fewest_trains = min(other.trains for other in game.players)
+        turns_left = max(0.0, fewest_trains - 2) / TRAINS_PER_TURN + 1
+
+        owners = [None] * compiled.num_routes  # Route id -> True for player's, False for opponents' routes
+        unclaimed_trains = 0
+        for conn in game.map.connections:
+            if conn.claimed_by is None:
+                unclaimed_trains += compiled.route_lengths[conn.id]
+            else:
+                owners[conn.id] = conn.claimed_by is player
+
+        opponents_trains = sum(min(other.trains, turns_left * TRAINS_PER_TURN) for other in game.players if other is not player)
+        taken_probability = min(MAX_TAKEN_PROBABILITY, opponents_trains / unclaimed_trains) if unclaimed_trains else 0.0
+
+        ends = {}  # Start city id -> {end city id: indices of the tickets}
+        for i, ticket in enumerate(tickets):
+            start = compiled.city_ids[ticket.start_city]
+            end = compiled.city_ids[ticket.end_city]
+            ends.setdefault(start, {}).setdefault(end, []).append(i)
+
+        completed = [0] * len(tickets)
+        samples = 0
+
+        while samples < self.samples and (deadline is None or samples == 0 or time.perf_counter() < deadline):
+            # Routes the player can use in this sample: own and the ones not taken by opponents
+            available = [
+                owner if owner is not None else rng.random() >= taken_probability for owner in owners
+            ]
+
+            for start, start_ends in ends.items():
+                for end, cost in self.path_costs(start, start_ends, available, owners, player.trains).items():
+                    trains, claims = cost
+                    missing_cards = max(0, trains - len(player.train_cards))
+                    if claims + (missing_cards + 1) // 2 <= turns_left:
+                        for i in start_ends[end]:
+                            completed[i] += 1
+
+            samples += 1
+
+        self.last_samples = samples
+
+        return [
+            (completed[i] / samples, completed[i] / samples * ticket.points)
+            for i, ticket in enumerate(tickets)
+        ]
+
+    def path_costs(self, start: int, ends: dict, available: list[bool], owners: list, max_trains: int):
+        """
+        Returns dict of end city id -> (trains, claims) of the cheapest path from the start city,
+        for the ends reachable with at most 'max_trains' trains.
+        Paths are compared by trains and then by the number of routes to claim.
+        """
+
+        compiled = self.compiled
+        # Cost is encoded in one int: trains * 256 + claims
+        costs = {start: 0}
+        queue = [(0, start)]
+        found = {}
+
+        while queue and len(found) < len(ends):
+            cost, city = heappop(queue)
+            if cost > costs[city]:
+                continue
+
+            if city in ends:
+                found[city] = divmod(cost, 256)
+
+            for position in range(compiled.adjacency_offsets[city], compiled.adjacency_offsets[city + 1]):
+                route_id = compiled.adjacency_routes[position]
+                if not available[route_id]:
+                    continue
+
+                if owners[route_id]:
+                    new_cost = cost
+                else:
+                    new_cost = cost + compiled.route_lengths[route_id] * 256 + 1
+                    if new_cost >> 8 > max_trains:
+                        continue
+
+                neighbour = compiled.adjacency_cities[position]
+                if new_cost < costs.get(neighbour, new_cost + 1):
+                    costs[neighbour] = new_cost
+                    heappush(queue, (new_cost, neighbour))
+
+        return found